@@ -1,84 +1,227 @@
 """Build vector store from jobs database."""
+import logging
+import os
 import sys
 import sqlite3
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from tqdm import tqdm
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.embeddings.embedding_cache import EmbeddingCache
 from src.embeddings.job_embedder import JobEmbedder
-from src.vectorstore.chroma_manager import ChromaManager
+from src.vectorstore.chroma_manager import INT8_INDEX_FILE, ChromaManager
+
+log = logging.getLogger("build")
+
+# Jobs per add_jobs call (ChromaDB performs best with 50-250 per batch)
+BATCH = ChromaManager.ADD_BATCH_SIZE
+
+# Fetched batches being embedded concurrently; Chroma writes stay on the
+# main thread because PersistentClient is backed by a single SQLite file
+EMBED_WORKERS = min(4, os.cpu_count() or 1)
+
+# Columns read by JobEmbedder.create_job_text and ChromaManager.add_jobs
+# (scraped_at/updated_at are never used)
+JOB_COLUMNS = (
+    "id", "title", "company", "location", "job_type", "category", "url",
+    "description", "requirements", "posted_date"
+)
 
 
-def load_jobs_from_db(db_path: str):
-    """Load all jobs from SQLite database."""
+def count_jobs(db_path: str) -> int:
+    """Count jobs in the SQLite database."""
     conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def iter_jobs_from_db(db_path: str, batch: int = 1000):
+    """
+    Stream jobs from SQLite in batches.
     
-    cursor.execute("SELECT * FROM jobs")
-    jobs = [dict(row) for row in cursor.fetchall()]
+    Args:
+        db_path: Path to the jobs database
+        batch: Number of rows fetched per batch
     
-    conn.close()
-    return jobs
+    Yields:
+        Lists of job dictionaries
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        # Plain tuples; zip them with the known column order instead of
+        # materializing a sqlite3.Row per row
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs")
+        
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            yield [dict(zip(JOB_COLUMNS, row)) for row in rows]
+    finally:
+        conn.close()
 
 
-def main():
-    """Build vector store from jobs."""
-    print("=" * 70)
-    print("Building Vector Store for Job Matching")
-    print("=" * 70)
+def embed_with_cache(embedder: JobEmbedder, cache: EmbeddingCache, jobs: List[Dict]) -> Tuple[np.ndarray, int]:
+    """
+    Embed jobs, reusing cached embeddings for unchanged job texts.
+    
+    Args:
+        embedder: Job embedder
+        cache: Embedding cache
+        jobs: Job dictionaries
+    
+    Returns:
+        NumPy array of embeddings in job order and the number of reused
+        cached embeddings
+    """
+    model = f"{embedder.embedding_model}:{embedder.embedding_options.get('dimensions', '')}"
+    keys = [cache.make_key(model, embedder.create_job_text(job)) for job in jobs]
+    cached = cache.get_many(keys)
+    
+    misses = [i for i, key in enumerate(keys) if key not in cached]
+    new_embeddings = None
+    if misses:
+        new_embeddings = embedder.embed_jobs([jobs[i] for i in misses])
+        cache.put_many([(keys[i], new_embeddings[n]) for n, i in enumerate(misses)])
+    
+    # Fill one preallocated array instead of stacking per-row vectors
+    dim = len(new_embeddings[0]) if misses else len(next(iter(cached.values())))
+    embeddings = np.empty((len(jobs), dim), dtype=np.float32)
+    
+    for i, key in enumerate(keys):
+        if key in cached:
+            embeddings[i] = cached[key]
+    if misses:
+        embeddings[misses] = new_embeddings
+    
+    reused = len(jobs) - len(misses)
+    log.debug(f"♻️  Reused {reused}/{len(jobs)} cached embeddings")
+    return embeddings, reused
+
+
+def store_jobs(chroma: ChromaManager, jobs: List[Dict], embeddings: Future, progress: tqdm) -> Tuple[int, int]:
+    """
+    Store one fetched batch of jobs once its embeddings are ready.
+    
+    Args:
+        chroma: Target ChromaDB manager
+        jobs: Job dictionaries of the batch
+        embeddings: Future resolving to embed_with_cache()'s result
+        progress: Progress bar to advance
+    
+    Returns:
+        Number of jobs stored and number of reused cached embeddings
+    """
+    embeddings, reused = embeddings.result()
+    
+    # Slices are views into the array; Chroma accepts them as-is
+    for i in range(0, len(jobs), BATCH):
+        chroma.add_jobs(jobs[i:i + BATCH], embeddings[i:i + BATCH])
+        progress.update(len(jobs[i:i + BATCH]))
+    
+    return len(jobs), reused
+
+
+def main(verify: bool = False):
+    """
+    Build vector store from jobs.
+    
+    Args:
+        verify: Read back a sample from the new collection afterwards
+    """
+    log.info("=" * 70)
+    log.info("Building Vector Store for Job Matching")
+    log.info("=" * 70)
     
-    # Load jobs
-    print("\n📂 Loading jobs from database...")
     db_path = Path(__file__).parent.parent / "data" / "jobs.db"
     
     if not db_path.exists():
-        print(f"❌ Database not found at: {db_path}")
-        print("💡 Please make sure jobs.db exists in the data/ folder")
+        log.error(f"❌ Database not found at: {db_path}")
+        log.error("💡 Please make sure jobs.db exists in the data/ folder")
         return
     
-    jobs = load_jobs_from_db(str(db_path))
-    print(f"✅ Loaded {len(jobs)} jobs")
-    
-    if len(jobs) == 0:
-        print("❌ No jobs found in database!")
+    # Check before the reset, so an empty database never wipes a working store
+    n_jobs = count_jobs(str(db_path))
+    if n_jobs == 0:
+        log.error("❌ No jobs found in database!")
         return
     
-    # Create embeddings
-    print("\n🤖 Creating embeddings...")
     embedder = JobEmbedder()
-    embeddings = embedder.embed_jobs(jobs)
-    print(f"✅ Created {len(embeddings)} embeddings")
-    
-    # Store in ChromaDB
-    print("\n💾 Storing in vector database...")
+    cache = EmbeddingCache()
     chroma = ChromaManager()
     chroma.create_collection(reset=True)
-    chroma.add_jobs(jobs, embeddings.tolist())
+    
+    # Load, embed and store jobs batch by batch
+    log.info("📂 Streaming jobs from database...")
+    total = 0
+    reused = 0
+    
+    # Close the cache even if the build fails; fetched embeddings are kept
+    try:
+        with chroma.bulk_load(), \
+                tqdm(total=n_jobs, unit="job", desc="Storing") as progress, \
+                ThreadPoolExecutor(max_workers=EMBED_WORKERS) as embed_pool:
+            # Embed upcoming batches in the background while the oldest is stored
+            pending = deque()
+            
+            for jobs in iter_jobs_from_db(str(db_path)):
+                pending.append((jobs, embed_pool.submit(embed_with_cache, embedder, cache, jobs)))
+                
+                if len(pending) > EMBED_WORKERS:
+                    stored, batch_reused = store_jobs(chroma, *pending.popleft(), progress)
+                    total += stored
+                    reused += batch_reused
+            
+            while pending:
+                stored, batch_reused = store_jobs(chroma, *pending.popleft(), progress)
+                total += stored
+                reused += batch_reused
+    finally:
+        cache.close()
+    
+    log.info(f"♻️  Reused {reused}/{total} cached embeddings")
+    log.info(f"✅ Embedded and stored {total} jobs")
+    
+    # Quantized per batch by add_jobs, written when bulk_load() exited
+    log.info(f"✅ Wrote int8 index ({INT8_INDEX_FILE})")
     
     # Show stats
     stats = chroma.get_stats()
-    print(f"\n✅ Vector store built successfully!")
-    print(f"   Total jobs indexed: {stats['count']}")
-    print(f"   Collection name: {stats.get('name', 'jobs')}")
-    print("=" * 70)
-    
-    # Verify the collection
-    print("\n🔍 Verifying collection...")
-    from src.rag.retriever import JobRetriever
-    try:
-        retriever = JobRetriever()
-        verify_stats = retriever.get_collection_stats()
-        print(f"✅ Verification successful!")
-        print(f"   Jobs in collection: {verify_stats['total_jobs']}")
-        print(f"   Vectors count: {verify_stats['vectors_count']}")
-    except Exception as e:
-        print(f"⚠️  Warning during verification: {e}")
+    log.info(f"✅ Vector store built successfully!")
+    log.info(f"   Total jobs indexed: {stats['count']}")
+    log.info(f"   Collection name: {stats.get('name', 'jobs')}")
+    log.info("=" * 70)
     
-    print("\n" + "=" * 70)
-    print("🎉 You can now run: streamlit run app.py")
-    print("=" * 70)
+    # Optional verification on the same client (no second index load)
+    if verify:
+        log.info("🔍 Verifying collection...")
+        try:
+            sample = chroma.collection.get(limit=1, include=["metadatas"])
+            log.info(f"✅ Verification successful!")
+            log.info(f"   Jobs in collection: {stats['count']}")
+            if sample['metadatas']:
+                log.info(f"   Sample job: {sample['metadatas'][0].get('title')}")
+        except Exception as e:
+            log.warning(f"⚠️  Warning during verification: {e}")
+        
+    log.info("=" * 70)
+    log.info("🎉 You can now run: streamlit run app.py")
+    log.info("=" * 70)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+    main(verify="--verify" in sys.argv)
\ No newline at end of file
@@ -10,9 +10,21 @@ ssl._create_default_https_context = ssl._create_unverified_context
 os.environ['CURL_CA_BUNDLE'] = ''
 os.environ['REQUESTS_CA_BUNDLE'] = ''
 
-from sentence_transformers import SentenceTransformer
+from huggingface_hub import snapshot_download
+from huggingface_hub.utils import LocalEntryNotFoundError
 
-print("Downloading model...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-print("✅ Model downloaded successfully!")
-print(f"Model saved to: {model._model_card_vars['model_name']}")
\ No newline at end of file
+MODEL_ID = 'sentence-transformers/all-MiniLM-L6-v2'
+
+# Only the safetensors weights, configs and tokenizer files (skips pytorch_model.bin etc.)
+ALLOW_PATTERNS = ["*.safetensors", "*.json", "tokenizer*", "vocab*"]
+
+try:
+    # Fast path: already in the local cache, no network round-trip
+    path = snapshot_download(MODEL_ID, allow_patterns=ALLOW_PATTERNS, local_files_only=True)
+    print("✅ Model already cached")
+except LocalEntryNotFoundError:
+    print("Downloading model...")
+    path = snapshot_download(MODEL_ID, allow_patterns=ALLOW_PATTERNS)
+    print("✅ Model downloaded successfully!")
+
+print(f"Model saved to: {path}")
\ No newline at end of file
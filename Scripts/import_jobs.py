@@ -2,7 +2,6 @@
 import sys
 import sqlite3
 from pathlib import Path
-import shutil
 
 def import_jobs(source_db: str, dest_db: str):
     """Copy jobs database from itcs-job-matcher."""
@@ -17,8 +16,18 @@ def import_jobs(source_db: str, dest_db: str):
     # Create data directory
     dest_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Copy database
-    shutil.copy2(source_path, dest_path)
+    # Copy database page by page with SQLite's online backup API
+    src = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(dest_db)
+    try:
+        src.backup(
+            dst,
+            pages=1024,
+            progress=lambda status, remaining, total: print(f"📦 Copied {total - remaining}/{total} pages")
+        )
+    finally:
+        src.close()
+        dst.close()
     
     # Verify
     conn = sqlite3.connect(dest_db)
@@ -1,5 +1,6 @@
 # test_cv_parser.py
 import logging
+from importlib.util import find_spec
 logging.basicConfig(level=logging.INFO)
 
 from src.cv.cv_parser import get_cv_parser
@@ -20,22 +21,20 @@ try:
 except Exception as e:
     print(f"\n❌ TXT parsing failed: {e}")
 
-# Check PDF support
-try:
-    from pypdf import PdfReader
+# Check PDF support (find_spec only locates the packages, nothing is imported)
+if find_spec("pymupdf"):
+    print("\n✅ PDF support is available (pymupdf installed)")
+elif find_spec("pypdf"):
     print("\n✅ PDF support is available (pypdf installed)")
-except ImportError:
-    try:
-        from PyPDF2 import PdfReader
-        print("\n✅ PDF support is available (PyPDF2 installed)")
-    except ImportError:
-        print("\n❌ PDF support NOT available - run: pip install pypdf")
+elif find_spec("PyPDF2"):
+    print("\n✅ PDF support is available (PyPDF2 installed)")
+else:
+    print("\n❌ PDF support NOT available - run: pip install pymupdf")
 
 # Check DOCX support
-try:
-    from docx import Document
+if find_spec("docx"):
     print("✅ DOCX support is available")
-except ImportError:
+else:
     print("❌ DOCX support NOT available - run: pip install python-docx")
 
 print("\n" + "="*60)
@@ -27,16 +27,16 @@ def test_rag_system():
         "Full-stack developer with React experience",
     ]
     
-    for i, query in enumerate(test_queries, 1):
+    # Retrieve relevant jobs for all queries in one batch
+    print("\n🔍 Retrieving relevant jobs for all queries...")
+    all_jobs = retriever.retrieve_jobs_batch(test_queries, top_k=5)
+    
+    for i, (query, jobs) in enumerate(zip(test_queries, all_jobs), 1):
         print(f"\n{'='*70}")
         print(f"Test Query {i}: {query}")
         print('='*70)
         
-        # Retrieve relevant jobs
-        print("\n🔍 Retrieving relevant jobs...")
-        jobs = retriever.search_jobs(query, n_results=5)
-        
-        print(f"✅ Found {len(jobs)} relevant jobs")
+        print(f"\n✅ Found {len(jobs)} relevant jobs")
         
         # Display top jobs
         print("\n📋 Top matching jobs:")
@@ -44,17 +44,18 @@ def test_rag_system():
             print(f"\n{j}. {job['title']}")
             print(f"   Company: {job['company']}")
             print(f"   Location: {job['location']}")
-            print(f"   Relevance: {job['relevance_score']:.2%}")
+            print(f"   Relevance: {job['relevance_score']:.1f}%")
             print(f"   URL: {job['url']}")
         
-        # Generate response
+        # Generate response, printing tokens as they arrive
         print("\n🤖 Generating AI response...")
         job_context = retriever.get_job_context(jobs)
-        response = generator.generate_response(query, jobs, job_context)
         
         print("\n💬 AI Response:")
         print("-" * 70)
-        print(response)
+        for chunk in generator.generate_response_stream(query, jobs, job_context):
+            print(chunk, end='', flush=True)
+        print()
         print("-" * 70)
     
     print("\n" + "=" * 70)
@@ -3,13 +3,20 @@ Job Fair Navigator - Streamlit Application
 Help users find the best-fitting jobs and get personalized approach strategies
 """
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import os
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 import csv
-from io import StringIO
+import hashlib
+import json
+from operator import itemgetter
 
-from src.cv.cv_parser import get_cv_parser
+from src.cv.cv_parser import get_cv_parser, parse_cv_file
 
 
 # Add src to path
@@ -42,28 +49,6 @@ st.markdown("""
         text-align: center;
         margin-bottom: 2rem;
     }
-    .job-card {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid #1f77b4;
-        margin-bottom: 1rem;
-    }
-    .job-title {
-        font-size: 1.3rem;
-        font-weight: bold;
-        color: #1f77b4;
-        margin-bottom: 0.5rem;
-    }
-    .job-company {
-        font-size: 1.1rem;
-        color: #333;
-        margin-bottom: 0.3rem;
-    }
-    .job-details {
-        color: #666;
-        font-size: 0.95rem;
-    }
     .relevance-badge {
         background-color: #28a745;
         color: white;
@@ -81,13 +66,6 @@ st.markdown("""
         background-color: #dc3545;
         color: white;
     }
-    .strategy-box {
-        background-color: #fff3cd;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #ffc107;
-        margin-top: 1rem;
-    }
     .stats-box {
         background-color: #e7f3ff;
         padding: 1rem;
@@ -111,6 +89,13 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# System messages reused by every request of their kind
+_TRANSLATOR_SYS = {"role": "system", "content": "You are a professional translator."}
+_JOB_COACH_SYS = {"role": "system", "content": "You are a career coach helping candidates prepare for job fair interactions."}
+_FAIR_COACH_SYS = {"role": "system", "content": "You are a career coach helping candidates prepare for job fairs."}
+_CV_ANALYST_SYS = {"role": "system", "content": "You are an expert at analyzing CVs and extracting key information."}
+
+
 # Initialize session state
 if 'retriever' not in st.session_state:
     st.session_state.retriever = None
@@ -120,6 +105,8 @@ if 'conversation_history' not in st.session_state:
     st.session_state.conversation_history = []
 if 'current_jobs' not in st.session_state:
     st.session_state.current_jobs = []
+if 'current_sort_key' not in st.session_state:
+    st.session_state.current_sort_key = None
 if 'user_cv' not in st.session_state:
     st.session_state.user_cv = ""
 
@@ -129,6 +116,8 @@ def initialize_rag_system():
     """Initialize RAG components (cached for performance)."""
     try:
         retriever = JobRetriever()
+        # One metadata pass per process; filter lists are served from it
+        retriever.build_metadata_index()
         generator = JobResponseGenerator()
         return retriever, generator
     except Exception as e:
@@ -142,62 +131,65 @@ def format_job_context(jobs: List[Dict]) -> str:
     if not jobs:
         return "No jobs found."
     
-    context_parts = []
-    for i, job in enumerate(jobs[:5], 1):  # Top 5 jobs
-        context = f"""Job {i}:
-Title: {job['title']}
-Company: {job['company']}
-Location: {job['location']}
-Type: {job.get('job_type', 'N/A')}
-Category: {job.get('category', 'N/A')}
-Relevance: {job.get('relevance_score', 0):.1f}%
-Description: {job.get('description', 'N/A')[:300]}...
-Requirements: {job.get('requirements', 'N/A')[:300]}...
-URL: {job['url']}
-"""
-        context_parts.append(context.strip())
-    
-    return "\n\n".join(context_parts)
+    # One compact line per job keeps the prompt (and its token count) small
+    return "\n\n".join(
+        f"Job {i}: {job['title']} @ {job['company']} | {job['location']} | "
+        f"{job.get('job_type', 'N/A')} | {job.get('category', 'N/A')} | "
+        f"rel {job.get('relevance_score', 0):.0f}% | "
+        f"{job.get('description', '')[:250]} | {job.get('requirements', '')[:250]} | {job['url']}"
+        for i, job in enumerate(jobs[:5], 1)  # Top 5 jobs
+    )
 
 
 def sort_jobs(jobs: List[Dict], sort_by: str = "relevance") -> List[Dict]:
     """Sort jobs by different criteria."""
+    # Jobs from JobRetriever always carry these keys, so the C-level
+    # itemgetter can replace per-item lambdas with .get defaults
     if sort_by == "relevance":
-        return sorted(jobs, key=lambda x: x.get('relevance_score', 0), reverse=True)
-    elif sort_by == "company":
-        return sorted(jobs, key=lambda x: x.get('company', 'Unknown'))
-    elif sort_by == "location":
-        return sorted(jobs, key=lambda x: x.get('location', 'Unknown'))
-    elif sort_by == "title":
-        return sorted(jobs, key=lambda x: x.get('title', 'Unknown'))
+        return sorted(jobs, key=itemgetter('relevance_score'), reverse=True)
+    elif sort_by in ("company", "location", "title"):
+        return sorted(jobs, key=itemgetter(sort_by))
     return jobs
 
 
-def export_jobs_to_csv(jobs: List[Dict]) -> str:
-    """Export jobs to CSV format."""
-    output = StringIO()
-    
-    if not jobs:
-        return ""
+class _Echo:
+    """File-like object whose write() returns the value instead of buffering it."""
     
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_job_rows(jobs: List[Dict]) -> Iterator[str]:
+    """Yield the CSV export one serialized line at a time, header first."""
     # Define CSV columns
     fieldnames = ['title', 'company', 'location', 'job_type', 'category', 'relevance_score', 'url']
     
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    
-    for job in jobs:
-        writer.writerow({
-            'title': job.get('title', ''),
-            'company': job.get('company', ''),
-            'location': job.get('location', ''),
-            'job_type': job.get('job_type', ''),
-            'category': job.get('category', ''),
-            'relevance_score': f"{job.get('relevance_score', 0):.1f}%",
-            'url': job.get('url', '')
-        })
+    # writerow() returns the formatted line because _Echo.write returns it
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fieldnames)
+    
+    # Plain tuples in fieldnames order (no per-row dict for DictWriter to reorder)
+    yield from map(writer.writerow, (
+        (
+            job.get('title', ''),
+            job.get('company', ''),
+            job.get('location', ''),
+            job.get('job_type', ''),
+            job.get('category', ''),
+            f"{job.get('relevance_score', 0):.1f}%",
+            job.get('url', '')
+        )
+        for job in jobs
+    ))
+
+
+def export_jobs_to_csv(jobs: List[Dict]) -> str:
+    """Export jobs to CSV format."""
+    if not jobs:
+        return ""
     
-    return output.getvalue()
+    # st.download_button needs the complete payload
+    return "".join(iter_job_rows(jobs))
 
 
 def get_relevance_badge_class(score: float) -> str:
@@ -214,21 +206,41 @@ def get_relevance_badge_class(score: float) -> str:
 if 'translate_to_english' not in st.session_state:
     st.session_state.translate_to_english = False
 
+# Common German function words; English postings contain (almost) none of them
+_GERMAN_STOPWORDS = frozenset({
+    "der", "die", "das", "und", "für", "mit", "ist", "ein", "eine", "wir",
+    "sie", "du", "bei", "auf", "zu", "von", "den", "im", "oder", "nicht"
+})
+
+
+def _is_probably_german(text: str) -> bool:
+    """Cheap check whether a text needs translating at all."""
+    if any(char in text for char in "äöüÄÖÜß"):
+        return True
+    return len(_GERMAN_STOPWORDS.intersection(text.lower().split())) >= 2
+
+
 # Add this function for translation
+@st.cache_data(show_spinner=False)
 def translate_text(text: str, target_lang: str = "en") -> str:
-    """Translate text using Azure OpenAI."""
-    generator = st.session_state.generator
-    
-    prompt = f"""Translate the following German text to {target_lang}. 
-    Maintain the original formatting and structure.
+    """Translate text using Azure OpenAI (memoized per text and language)."""
+    # Already English (or not German): skip the request
+    if not _is_probably_german(text):
+        return text
     
-    Text to translate:
-    {text}
+    # Shared cached resource, so no session state is read inside the cache
+    _, generator = initialize_rag_system()
     
-    Provide only the translation, no explanations."""
+    prompt = f"""Translate the following German text to {target_lang}.
+Maintain the original formatting and structure.
+
+Text to translate:
+{text}
+
+Provide only the translation, no explanations."""
     
     messages = [
-        {"role": "system", "content": "You are a professional translator."},
+        _TRANSLATOR_SYS,
         {"role": "user", "content": prompt}
     ]
     
@@ -241,20 +253,84 @@ def translate_text(text: str, target_lang: str = "en") -> str:
     
     return response.choices[0].message.content
 
+@st.cache_data(show_spinner=False)
+def translate_job_fields(job_id, description: str, requirements: str, target_lang: str = "en") -> Dict[str, str]:
+    """Translate a job's description and requirements in a single request."""
+    needs_translation = _is_probably_german(description), _is_probably_german(requirements)
+    
+    # At most one German field: translate just that one (or nothing)
+    if not all(needs_translation):
+        return {
+            'description': translate_text(description, target_lang) if needs_translation[0] else description,
+            'requirements': translate_text(requirements, target_lang) if needs_translation[1] else requirements
+        }
+    
+    _, generator = initialize_rag_system()
+    
+    fields = json.dumps({'description': description, 'requirements': requirements}, ensure_ascii=False)
+    
+    prompt = f"""Translate the values of the following JSON object from German to {target_lang}.
+Maintain the original formatting and structure of each text.
+
+{fields}
+
+Respond with only a JSON object with the keys "description" and "requirements"."""
+    
+    messages = [
+        _TRANSLATOR_SYS,
+        {"role": "user", "content": prompt}
+    ]
+    
+    response = generator.client.chat.completions.create(
+        model=generator.deployment,
+        messages=messages,
+        temperature=0.3,
+        max_tokens=3000
+    )
+    
+    content = response.choices[0].message.content.strip()
+    
+    # Tolerate a ```json fenced reply
+    if content.startswith("```"):
+        content = content.strip("`").removeprefix("json").strip()
+    
+    try:
+        translated = json.loads(content)
+        return {'description': translated['description'], 'requirements': translated['requirements']}
+    except (ValueError, KeyError, TypeError):
+        # Malformed JSON: fall back to one request per field
+        return {
+            'description': translate_text(description, target_lang),
+            'requirements': translate_text(requirements, target_lang)
+        }
+
+def translate_many(jobs: List[Dict], max_workers: int = 8) -> List[Dict[str, str]]:
+    """Translate several jobs' fields concurrently (the requests are I/O-bound)."""
+    ctx = get_script_run_ctx()
+    
+    def translate(job: Dict) -> Dict[str, str]:
+        # Attach the session's context so st.cache_data works in the worker
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return translate_job_fields(
+            job['id'],
+            job.get('description', 'No description available'),
+            job.get('requirements', 'No requirements listed')
+        )
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(translate, jobs))
+
 # Update the display_job_card function to include translation
+@st.fragment
 def display_job_card(job: Dict, index: int):
-    """Display a job as a card with details."""
+    """Display a job as a card with details (reruns on its own, not the whole app)."""
     relevance = job.get('relevance_score', 0)
     
-    st.markdown(f"""
-    <div class="job-card">
-        <div class="job-title">🎯 {job['title']}</div>
-        <div class="job-company">🏢 {job['company']}</div>
-        <div class="job-details">
-            📍 {job['location']} | 💼 {job.get('job_type', 'N/A')} | 🏷️ {job.get('category', 'N/A')}
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    # Native elements: Streamlit diffs them across reruns instead of resending HTML
+    with st.container(border=True):
+        st.subheader(f"🎯 {job['title']}")
+        st.markdown(f"🏢 **{job['company']}**")
+        st.caption(f"📍 {job['location']} | 💼 {job.get('job_type', 'N/A')} | 🏷️ {job.get('category', 'N/A')}")
     
     with st.expander(f"📋 View Full Details & Strategy for {job['title']}", expanded=False):
         col1, col2 = st.columns([2, 1])
@@ -268,22 +344,24 @@ def display_job_card(job: Dict, index: int):
             if st.button("🌐 Translate to English" if not st.session_state[translate_key] else "🇩🇪 Show Original", 
                         key=f"trans_btn_{job['id']}_{index}"):
                 st.session_state[translate_key] = not st.session_state[translate_key]
-                st.rerun()
+                st.rerun(scope="fragment")
             
-            # Display description
-            st.markdown("**📝 Job Description:**")
             description = job.get('description', 'No description available')
-            if st.session_state[translate_key] and description != 'No description available':
+            requirements = job.get('requirements', 'No requirements listed')
+            
+            # Translate both fields with one request
+            if st.session_state[translate_key]:
                 with st.spinner("Translating..."):
-                    description = translate_text(description)
+                    translated = translate_job_fields(job['id'], description, requirements)
+                description = translated['description']
+                requirements = translated['requirements']
+            
+            # Display description
+            st.markdown("**📝 Job Description:**")
             st.write(description)
             
             # Display requirements
             st.markdown("**✅ Requirements:**")
-            requirements = job.get('requirements', 'No requirements listed')
-            if st.session_state[translate_key] and requirements != 'No requirements listed':
-                with st.spinner("Translating..."):
-                    requirements = translate_text(requirements)
             st.write(requirements)
             
             st.markdown(f"**🔗 Job URL:** [{job['url']}]({job['url']})")
@@ -298,19 +376,73 @@ def display_job_card(job: Dict, index: int):
         
         # Generate personalized approach strategy
         if st.button(f"🎯 Get Approach Strategy", key=f"strategy_{job['id']}_{index}"):
-            with st.spinner("Generating personalized approach strategy..."):
-                strategy = generate_approach_strategy(job, st.session_state.user_cv)
-                st.markdown(f"""
-                <div class="strategy-box">
-                    <h4>🎯 Your Personalized Approach Strategy:</h4>
-                    {strategy}
-                </div>
-                """, unsafe_allow_html=True)
+            with st.container(border=True):
+                st.markdown("#### 🎯 Your Personalized Approach Strategy:")
+                generate_approach_strategy(job, st.session_state.user_cv)
+
+
+def _stream_completion(messages: List[Dict], temperature: float, max_tokens: int) -> Iterator[str]:
+    """Yield a chat completion's text as it is generated."""
+    _, generator = initialize_rag_system()
+    
+    stream = generator.client.chat.completions.create(
+        model=generator.deployment,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    
+    for chunk in stream:
+        # Azure sends a first chunk with prompt filter results and no choices
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+# Generated strategies kept per process
+STRATEGY_STORE_SIZE = 256
+
+
+@st.cache_resource
+def _strategy_store() -> Tuple[OrderedDict, threading.Lock]:
+    """
+    Generated strategies keyed by (job id, CV hash), shared across reruns and
+    sessions, with the lock guarding it (sessions run in separate threads).
+    """
+    return OrderedDict(), threading.Lock()
+
 
 def generate_approach_strategy(job: Dict, user_cv: str) -> str:
-    """Generate a personalized strategy for approaching this company at the job fair."""
-    generator = st.session_state.generator
+    """
+    Show a personalized strategy for approaching this company at the job fair.
+    
+    The first request for a (job, CV) pair streams the response onto the
+    page; repeats are served from the strategy store.
+    """
+    cv_hash = hashlib.blake2b(user_cv.encode(), digest_size=8).hexdigest() if user_cv else ""
+    key = (job['id'], cv_hash)
+    store, lock = _strategy_store()
+    
+    with lock:
+        strategy = store.get(key)
+    
+    if strategy is not None:
+        st.markdown(strategy)
+        return strategy
     
+    # Streamed outside the lock; other sessions keep reading the store meanwhile
+    strategy = st.write_stream(_stream_strategy(job, user_cv))
+    
+    with lock:
+        store[key] = strategy
+        while len(store) > STRATEGY_STORE_SIZE:
+            store.popitem(last=False)  # Drop the oldest entry
+    
+    return strategy
+
+
+def _stream_strategy(job: Dict, user_cv: str) -> Iterator[str]:
+    """Stream the approach strategy for one job."""
     cv_context = f"\n\nCandidate Background:\n{user_cv}" if user_cv else ""
     
     prompt = f"""Based on this job posting, provide a concise, actionable strategy for approaching this company at a job fair in person.
@@ -331,27 +463,21 @@ Provide:
 Keep it practical and specific to this role. Format as a clear, bulleted list."""
 
     messages = [
-        {"role": "system", "content": "You are a career coach helping candidates prepare for job fair interactions."},
+        _JOB_COACH_SYS,
         {"role": "user", "content": prompt}
     ]
     
-    response = generator.client.chat.completions.create(
-        model=generator.deployment,
-        messages=messages,
-        temperature=0.7,
-        max_tokens=600
-    )
-    
-    return response.choices[0].message.content
+    return _stream_completion(messages, temperature=0.7, max_tokens=600)
 
 
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
 def search_jobs_by_cv(cv_text: str, top_k: int = 10) -> List[Dict]:
     """
     Search for jobs matching the user's CV.
     Uses intelligent keyword extraction and semantic search.
+    Cached, so repeating a search skips the extraction call and the vector search.
     """
-    retriever = st.session_state.retriever
-    generator = st.session_state.generator
+    retriever, generator = initialize_rag_system()
     
     # Extract key skills and experience using AI
     extraction_prompt = f"""Analyze this CV and extract:
@@ -371,7 +497,7 @@ Locations: [list if any]
 """
     
     messages = [
-        {"role": "system", "content": "You are an expert at analyzing CVs and extracting key information."},
+        _CV_ANALYST_SYS,
         {"role": "user", "content": extraction_prompt}
     ]
     
@@ -399,28 +525,65 @@ Full CV Summary:
     return jobs
 
 
+@st.cache_resource
+def _cv_parse_pool() -> ProcessPoolExecutor:
+    """Worker processes for CV parsing, shared by all sessions."""
+    return ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _parse_cv_cached(file_hash: str, filename: str, _content: bytes) -> Optional[str]:
+    """Parse an uploaded CV once per file; file_hash stands in for the unhashed bytes."""
+    # PDF parsing and OCR are CPU-bound; a worker process keeps them off the GIL
+    # that every session's script thread shares
+    return _cv_parse_pool().submit(parse_cv_file, _content, filename).result()
+
+
 def search_jobs_by_query(query: str, filters: Dict, top_k: int = 10) -> List[Dict]:
     """Search jobs by query and filters."""
-    retriever = st.session_state.retriever
+    # Sorted (key, value) pairs give a stable, hashable cache key
+    return _cached_query(query, tuple(sorted(filters.items())), top_k)
+
+
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
+def _cached_query(query: str, filter_items: tuple, top_k: int) -> List[Dict]:
+    """Cached query search; repeats skip the embedding request and vector search."""
+    retriever, _ = initialize_rag_system()
+    filters = dict(filter_items)
     
-    # Build filter dict
-    where_filter = {}
-    if filters.get('location') and filters['location'] != "All":
-        where_filter['location'] = {'$eq': filters['location']}
-    if filters.get('job_type') and filters['job_type'] != "All":
-        where_filter['job_type'] = {'$eq': filters['job_type']}
-    if filters.get('category') and filters['category'] != "All":
-        where_filter['category'] = {'$eq': filters['category']}
+    # Build filter conditions
+    conditions = [
+        {field: {'$eq': filters[field]}}
+        for field in ('location', 'job_type', 'category')
+        if filters.get(field) and filters[field] != "All"
+    ]
+    
+    # Chroma accepts one field per where clause; several must be combined with $and.
+    # The filter is applied inside the vector search, so top_k results all match it.
+    if len(conditions) > 1:
+        where_filter = {'$and': conditions}
+    elif conditions:
+        where_filter = conditions[0]
+    else:
+        where_filter = None
     
     jobs = retriever.retrieve_jobs(
         query=query,
         top_k=top_k,
-        filter_dict=where_filter if where_filter else None
+        filter_dict=where_filter
     )
     
     return jobs
 
 
+def render_chat_message(role: str, content: str, target=st):
+    """Render one chat message bubble (into `target`, e.g. an st.empty placeholder)."""
+    if role == 'user':
+        target.markdown(f'<div class="chat-message user-message"><strong>You:</strong><br>{content}</div>', unsafe_allow_html=True)
+    else:
+        target.markdown(f'<div class="chat-message assistant-message"><strong>🤖 Assistant:</strong><br>{content}</div>', unsafe_allow_html=True)
+
+
 def main():
     """Main application."""
     
@@ -508,8 +671,18 @@ def main():
                 }[x]
             )
             
-            if sort_option:
+            # Only re-sort when the sort key changes, not on every rerun
+            if sort_option and sort_option != st.session_state.current_sort_key:
                 st.session_state.current_jobs = sort_jobs(st.session_state.current_jobs, sort_option)
+                st.session_state.current_sort_key = sort_option
+        
+        # Translate every result at once
+        if st.session_state.current_jobs:
+            if st.button("🌐 Translate All Results", use_container_width=True):
+                with st.spinner("Translating all results..."):
+                    translate_many(st.session_state.current_jobs)
+                for i, job in enumerate(st.session_state.current_jobs):
+                    st.session_state[f"translate_{job['id']}_{i}"] = True
         
         st.markdown("---")
         
@@ -517,6 +690,7 @@ def main():
         if st.button("🔄 Clear All", use_container_width=True):
             st.session_state.conversation_history = []
             st.session_state.current_jobs = []
+            st.session_state.current_sort_key = None
             st.session_state.user_cv = ""
             st.rerun()
     
@@ -527,48 +701,52 @@ def main():
         
         # Display conversation history
         for message in st.session_state.conversation_history:
-            role = message['role']
-            content = message['content']
-            
-            if role == 'user':
-                st.markdown(f'<div class="chat-message user-message"><strong>You:</strong><br>{content}</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="chat-message assistant-message"><strong>🤖 Assistant:</strong><br>{content}</div>', unsafe_allow_html=True)
+            render_chat_message(message['role'], message['content'])
         
         # Chat input
         user_query = st.chat_input("Ask about jobs at the fair...")
         
         if user_query:
-            # Add user message to history
+            # Add user message to history and show it right away
             st.session_state.conversation_history.append({
                 'role': 'user',
                 'content': user_query
             })
+            render_chat_message('user', user_query)
+            had_jobs = bool(st.session_state.current_jobs)
             
             # Search for jobs
             with st.spinner("🔍 Searching for relevant jobs..."):
                 jobs = search_jobs_by_query(user_query, {}, num_results)
                 st.session_state.current_jobs = jobs
+                st.session_state.current_sort_key = "relevance"
             
-            # Generate response
-            with st.spinner("🤖 Generating response..."):
-                job_context = format_job_context(jobs)
-                
-                # Use the correct method signature
-                response = generator.generate_response(
-                    query=user_query,
-                    jobs=jobs,
-                    job_context=job_context,
-                    conversation_history=st.session_state.conversation_history[:-1]
-                )
-                
-                # Add assistant response to history
-                st.session_state.conversation_history.append({
-                    'role': 'assistant',
-                    'content': response
-                })
+            # Stream the response into its bubble as tokens arrive
+            job_context = format_job_context(jobs)
+            placeholder = st.empty()
+            render_chat_message('assistant', "▌", placeholder)
             
-            st.rerun()
+            response = ""
+            for chunk in generator.generate_response_stream(
+                query=user_query,
+                jobs=jobs,
+                job_context=job_context,
+                conversation_history=st.session_state.conversation_history[:-1]
+            ):
+                response += chunk
+                render_chat_message('assistant', response + "▌", placeholder)
+            
+            render_chat_message('assistant', response, placeholder)
+            
+            # Add assistant response to history
+            st.session_state.conversation_history.append({
+                'role': 'assistant',
+                'content': response
+            })
+            
+            # The sidebar's sort controls only appear once there are results
+            if not had_jobs and jobs:
+                st.rerun()
         
         # Display current jobs
         if st.session_state.current_jobs:
@@ -662,7 +840,8 @@ def main():
                 with st.spinner("📖 Reading your CV..."):
                     try:
                         file_content = uploaded_file.getvalue()
-                        cv_text = cv_parser.parse_cv(file_content, uploaded_file.name)
+                        file_hash = hashlib.blake2b(file_content, digest_size=8).hexdigest()
+                        cv_text = _parse_cv_cached(file_hash, uploaded_file.name, file_content)
                         
                         if cv_text:
                             st.success(f"✅ Successfully extracted {len(cv_text)} characters from your CV!")
@@ -704,6 +883,7 @@ def main():
                     # Search for jobs
                     jobs = search_jobs_by_cv(cv_summary, num_results)
                     st.session_state.current_jobs = jobs
+                    st.session_state.current_sort_key = "relevance"
                 
                 if jobs:
                     st.success(f"✅ Found {len(jobs)} jobs matching your profile!")
@@ -734,45 +914,36 @@ def main():
             
             # Generate overall strategy
             if st.button("📋 Get Overall Job Fair Strategy", use_container_width=True):
-                with st.spinner("Generating your personalized job fair strategy..."):
+                with st.container(border=True):
+                    st.markdown("### 🎯 Your Job Fair Strategy:")
+                    
                     top_jobs = st.session_state.current_jobs[:5]
                     job_list = "\n".join([f"- {job['title']} at {job['company']}" for job in top_jobs])
                     
                     strategy_prompt = f"""Based on this candidate's CV and their top matching jobs, provide a comprehensive job fair strategy.
 
-    Candidate CV:
-    {st.session_state.user_cv[:1000]}
+Candidate CV:
+{st.session_state.user_cv[:1000]}
 
-    Top Matching Jobs:
-    {job_list}
+Top Matching Jobs:
+{job_list}
 
-    Provide:
-    1. Overall preparation tips
-    2. Priority order for visiting companies
-    3. General talking points that work across multiple companies
-    4. What to bring/prepare
-    5. Time management tips for the fair
+Provide:
+1. Overall preparation tips
+2. Priority order for visiting companies
+3. General talking points that work across multiple companies
+4. What to bring/prepare
+5. Time management tips for the fair
 
-    Keep it actionable and specific."""
+Keep it actionable and specific."""
 
                     messages = [
-                        {"role": "system", "content": "You are a career coach helping candidates prepare for job fairs."},
+                        _FAIR_COACH_SYS,
                         {"role": "user", "content": strategy_prompt}
                     ]
                     
-                    response = generator.client.chat.completions.create(
-                        model=generator.deployment,
-                        messages=messages,
-                        temperature=0.7,
-                        max_tokens=800
-                    )
-                    
-                    st.markdown(f"""
-                    <div class="strategy-box">
-                        <h3>🎯 Your Job Fair Strategy:</h3>
-                        {response.choices[0].message.content}
-                    </div>
-                    """, unsafe_allow_html=True)
+                    # Show the strategy as it is generated
+                    st.write_stream(_stream_completion(messages, temperature=0.7, max_tokens=800))
             
             st.markdown("---")
             
@@ -795,6 +966,7 @@ def main():
             with st.spinner("🔍 Searching jobs..."):
                 jobs = search_jobs_by_query(query, filters, num_results)
                 st.session_state.current_jobs = jobs
+                st.session_state.current_sort_key = "relevance"
             
             if jobs:
                 st.success(f"✅ Found {len(jobs)} matching jobs!")
@@ -2,36 +2,49 @@
 CV Parser - Extract text from various CV file formats
 Supports: PDF, DOCX, TXT, and images (with OCR)
 """
+import codecs
+import hashlib
 import io
 import logging
-from typing import Optional, Dict
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from itertools import repeat
+from typing import BinaryIO, Optional, Dict, Union
 from pathlib import Path
 
-# PDF parsing - using pypdf (not PyPDF2)
-try:
-    from pypdf import PdfReader
-    PDF_AVAILABLE = True
-except ImportError:
-    try:
-        # Fallback to PyPDF2 if available
-        from PyPDF2 import PdfReader
-        PDF_AVAILABLE = True
-    except ImportError:
-        PDF_AVAILABLE = False
-        logging.warning("pypdf not available. PDF parsing disabled.")
+# PDF parsing - PyMuPDF (MuPDF C library) preferred, pypdf/PyPDF2 as fallback.
+# Only probed here; the library is imported on first PDF parse.
+PYMUPDF_AVAILABLE = find_spec("pymupdf") is not None
+PYPDF_MODULE = next((name for name in ("pypdf", "PyPDF2") if find_spec(name)), None)
+PDF_AVAILABLE = PYMUPDF_AVAILABLE or PYPDF_MODULE is not None
+
+if not PDF_AVAILABLE:
+    logging.warning("pymupdf/pypdf not available. PDF parsing disabled.")
+
+# Encoding detection for non-UTF-8 text files (optional)
+CHARSET_NORMALIZER_AVAILABLE = find_spec("charset_normalizer") is not None
 
 # DOCX parsing
 try:
     from docx import Document
+    from docx.oxml.ns import qn
     DOCX_AVAILABLE = True
 except ImportError:
     DOCX_AVAILABLE = False
     logging.warning("python-docx not available. DOCX parsing disabled.")
 
-# Image OCR (optional)
+# Image OCR (optional); the in-process tesserocr API is preferred over
+# pytesseract, which spawns a tesseract subprocess per image
+TESSEROCR_AVAILABLE = find_spec("tesserocr") is not None
+
 try:
-    from PIL import Image
-    import pytesseract
+    from PIL import Image, ImageOps
+    if not TESSEROCR_AVAILABLE:
+        import pytesseract
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
@@ -40,6 +53,75 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _open_pypdf(content: bytes):
+    """Open a PDF with pypdf (or PyPDF2)."""
+    if PYPDF_MODULE == "pypdf":
+        from pypdf import PdfReader
+    else:
+        from PyPDF2 import PdfReader
+    
+    return PdfReader(io.BytesIO(content))
+
+
+def _pdf_page_count(content: bytes) -> int:
+    """Number of pages in a PDF."""
+    if PYMUPDF_AVAILABLE:
+        import pymupdf
+        
+        with pymupdf.open(stream=content, filetype="pdf") as doc:
+            return doc.page_count
+    
+    return len(_open_pypdf(content).pages)
+
+
+def _extract_pdf_text(content: bytes, start: int = 0, end: Optional[int] = None) -> str:
+    """
+    Extract the text of pages [start, end) of a PDF.
+    
+    Non-empty pages are each followed by a blank line. Module-level so
+    process pool workers can run it.
+    """
+    if PYMUPDF_AVAILABLE:
+        import pymupdf
+        
+        with pymupdf.open(stream=content, filetype="pdf") as doc:
+            return _write_page_texts(doc.pages(start, end), start, lambda page: page.get_text("text"))
+    
+    pages = _open_pypdf(content).pages[start:end]
+    return _write_page_texts(pages, start, lambda page: page.extract_text())
+
+
+def _write_page_texts(pages, offset: int, extract) -> str:
+    """Run a text extractor over pages, skipping empty and unreadable ones."""
+    # Written page by page so no list of page strings is held alongside the result
+    buf = io.StringIO()
+    for i, page in enumerate(pages, offset):
+        try:
+            text = extract(page)
+            if text and text.strip():
+                buf.write(text)
+                buf.write("\n\n")
+                logger.debug(f"Extracted {len(text)} chars from page {i+1}")
+        except Exception as e:
+            logger.warning(f"Could not extract text from page {i+1}: {e}")
+    
+    return buf.getvalue()
+
+
+# WordprocessingML tags read by _parse_docx
+if DOCX_AVAILABLE:
+    _W_P, _W_T, _W_TAB, _W_BR = qn('w:p'), qn('w:t'), qn('w:tab'), qn('w:br')
+    _W_TBL, _W_TR, _W_TC = qn('w:tbl'), qn('w:tr'), qn('w:tc')
+
+
+def _paragraph_text(p) -> str:
+    """Text of a w:p element, with tabs and line breaks kept."""
+    return "".join(
+        node.text or "" if node.tag == _W_T else "\t" if node.tag == _W_TAB else "\n"
+        for node in p.iter(_W_T, _W_TAB, _W_BR)
+    )
+
+
 class CVParser:
     """Parse CV files and extract text content."""
     
@@ -55,9 +137,27 @@ class CVParser:
     
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
     
+    # PDFs with at least this many pages are extracted in parallel
+    PARALLEL_PDF_PAGES = 8
+    
+    # Parsed texts kept in memory, keyed by file type and content hash
+    _CACHE_MAX = 128
+    
+    # OCR accuracy plateaus around this size; larger scans only cost time
+    OCR_MAX_SIDE = 1500
+    OCR_TIMEOUT = 10  # seconds per image
+    
     def __init__(self):
         """Initialize CV parser."""
         self.supported_formats = self._get_available_formats()
+        
+        # LRU of parsed texts; the parser singleton is shared across threads
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # tesserocr API, created on first OCR; one image at a time
+        self._tess_api = None
+        self._tess_lock = threading.Lock()
         logger.info(f"CV Parser initialized. Supported formats: {list(self.supported_formats.keys())}")
     
     def _get_available_formats(self) -> Dict[str, str]:
@@ -66,9 +166,9 @@ class CVParser:
         
         if PDF_AVAILABLE:
             formats['pdf'] = 'PDF Document'
-            logger.info("✅ PDF support enabled")
+            logger.info(f"✅ PDF support enabled ({'pymupdf' if PYMUPDF_AVAILABLE else PYPDF_MODULE})")
         else:
-            logger.warning("❌ PDF support disabled - install pypdf")
+            logger.warning("❌ PDF support disabled - install pymupdf or pypdf")
         
         if DOCX_AVAILABLE:
             formats['docx'] = 'Word Document'
@@ -83,23 +183,26 @@ class CVParser:
                 'jpg': 'Image (JPEG)',
                 'jpeg': 'Image (JPEG)'
             })
-            logger.info("✅ Image OCR support enabled")
+            logger.info(f"✅ Image OCR support enabled ({'tesserocr' if TESSEROCR_AVAILABLE else 'pytesseract'})")
         else:
             logger.warning("❌ Image OCR disabled - install pytesseract")
         
         return formats
     
-    def parse_cv(self, file_content: bytes, filename: str) -> Optional[str]:
+    def parse_cv(self, file_content: Union[bytes, BinaryIO], filename: str) -> Optional[str]:
         """
         Parse CV file and extract text.
         
         Args:
-            file_content: File content as bytes
+            file_content: File content as bytes, or a binary file object
+                (e.g. an open file or a Streamlit UploadedFile)
             filename: Original filename
         
         Returns:
             Extracted text or None if parsing failed
         """
+        file_content = self._read_content(file_content)
+        
         # Check file size
         if len(file_content) > self.MAX_FILE_SIZE:
             logger.error(f"File too large: {len(file_content)} bytes (max: {self.MAX_FILE_SIZE})")
@@ -112,6 +215,14 @@ class CVParser:
             logger.error(f"Unsupported file format: {ext}")
             raise ValueError(f"Unsupported file format: .{ext}. Supported formats: {', '.join(self.supported_formats.keys())}")
         
+        # Re-uploads of the same file skip parsing (and OCR) entirely
+        key = (ext, hashlib.blake2b(file_content, digest_size=16).hexdigest())
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                logger.info(f"Using cached text for {filename}")
+                return self._cache[key]
+        
         # Parse based on file type
         try:
             logger.info(f"Parsing {ext.upper()} file: {filename}")
@@ -127,6 +238,13 @@ class CVParser:
             else:
                 raise ValueError(f"No parser available for: {ext}")
             
+            # Empty results are cached too: an image without readable text
+            # would otherwise go through OCR again on every upload
+            with self._cache_lock:
+                self._cache[key] = text or None
+                if len(self._cache) > self._CACHE_MAX:
+                    self._cache.popitem(last=False)
+            
             if text:
                 logger.info(f"✅ Successfully extracted {len(text)} characters")
                 return text
@@ -138,50 +256,90 @@ class CVParser:
             logger.error(f"❌ Error parsing CV: {e}", exc_info=True)
             raise
     
+    def _read_content(self, file_content: Union[bytes, BinaryIO]) -> bytes:
+        """Get the bytes of an upload, reading file objects only once."""
+        if isinstance(file_content, bytes):
+            return file_content
+        if isinstance(file_content, (bytearray, memoryview)):
+            return bytes(file_content)
+        
+        # In-memory buffers (BytesIO, UploadedFile) hand out their bytes without a read loop
+        if hasattr(file_content, 'getvalue'):
+            return file_content.getvalue()
+        
+        # Real files: read at most one byte past the limit so oversized files fail fast
+        file_content.seek(0)
+        return file_content.read(self.MAX_FILE_SIZE + 1)
+    
     def _parse_txt(self, content: bytes) -> str:
         """Parse plain text file."""
+        # A byte order mark settles the encoding without trial decoding
+        if content.startswith(codecs.BOM_UTF8):
+            return content[len(codecs.BOM_UTF8):].decode('utf-8', errors='replace')
+        if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return content.decode('utf-16', errors='replace')
+        
         try:
             # Try UTF-8 first
             return content.decode('utf-8')
         except UnicodeDecodeError:
-            # Fallback to latin-1
-            try:
-                return content.decode('latin-1')
-            except:
-                return content.decode('utf-8', errors='ignore')
+            pass
+        
+        # Detect the encoding once from a sample, then decode a single time
+        encoding = 'latin-1'
+        if CHARSET_NORMALIZER_AVAILABLE:
+            from charset_normalizer import from_bytes
+            
+            best = from_bytes(content[:4096]).best()
+            if best is not None:
+                encoding = best.encoding
+        
+        logger.info(f"Decoding text file as {encoding}")
+        return content.decode(encoding, errors='replace')
     
     def _parse_pdf(self, content: bytes) -> Optional[str]:
         """Parse PDF file."""
         if not PDF_AVAILABLE:
-            raise ImportError("PDF parsing not available. Please install: pip install pypdf")
+            raise ImportError("PDF parsing not available. Please install: pip install pymupdf")
         
         try:
-            pdf_file = io.BytesIO(content)
-            pdf_reader = PdfReader(pdf_file)
-            
-            logger.info(f"PDF has {len(pdf_reader.pages)} pages")
+            n_pages = _pdf_page_count(content)
+            logger.info(f"PDF has {n_pages} pages")
             
-            text_parts = []
-            for i, page in enumerate(pdf_reader.pages):
-                try:
-                    text = page.extract_text()
-                    if text and text.strip():
-                        text_parts.append(text)
-                        logger.debug(f"Extracted {len(text)} chars from page {i+1}")
-                except Exception as e:
-                    logger.warning(f"Could not extract text from page {i+1}: {e}")
+            # Small CVs are not worth the process pool start-up, and pool
+            # workers (see parse_cv_file) do not start pools of their own
+            if n_pages >= self.PARALLEL_PDF_PAGES and multiprocessing.parent_process() is None:
+                full_text = self._extract_pdf_text_parallel(content, n_pages)
+            else:
+                full_text = _extract_pdf_text(content)
             
-            if not text_parts:
+            full_text = full_text.rstrip()
+            if not full_text:
                 logger.warning("No text extracted from PDF. It might be an image-based PDF.")
                 return None
             
-            full_text = '\n\n'.join(text_parts)
             return full_text
         
         except Exception as e:
             logger.error(f"Error parsing PDF: {e}", exc_info=True)
             raise ValueError(f"Failed to parse PDF: {str(e)}")
     
+    def _extract_pdf_text_parallel(self, content: bytes, n_pages: int) -> str:
+        """Extract page texts with worker processes, each handling a disjoint page range."""
+        workers = min(os.cpu_count() or 1, 4)
+        if workers < 2:
+            return _extract_pdf_text(content)
+        
+        step = -(-n_pages // workers)  # ceil division
+        starts = range(0, n_pages, step)
+        ends = [min(start + step, n_pages) for start in starts]
+        
+        logger.info(f"Extracting {n_pages} pages with {len(ends)} worker processes")
+        
+        # Each worker reopens the PDF from the raw bytes; results come back in page order
+        with ProcessPoolExecutor(max_workers=len(ends)) as pool:
+            return "".join(pool.map(_extract_pdf_text, repeat(content), starts, ends))
+    
     def _parse_docx(self, content: bytes) -> Optional[str]:
         """Parse DOCX file."""
         if not DOCX_AVAILABLE:
@@ -191,19 +349,23 @@ class CVParser:
             docx_file = io.BytesIO(content)
             doc = Document(docx_file)
             
+            # One pass over the body XML in document order; python-docx's
+            # Paragraph/_Cell wrappers re-walk the tree on every access
             text_parts = []
-            
-            # Extract paragraphs
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
-            
-            # Extract tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = ' | '.join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                    if row_text:
-                        text_parts.append(row_text)
+            for child in doc.element.body.iterchildren():
+                if child.tag == _W_P:
+                    text = _paragraph_text(child)
+                    if text.strip():
+                        text_parts.append(text)
+                elif child.tag == _W_TBL:
+                    for tr in child.iterchildren(_W_TR):
+                        cells = (
+                            '\n'.join(_paragraph_text(p) for p in tc.iter(_W_P)).strip()
+                            for tc in tr.iterchildren(_W_TC)
+                        )
+                        row_text = ' | '.join(cell for cell in cells if cell)
+                        if row_text:
+                            text_parts.append(row_text)
             
             if not text_parts:
                 logger.warning("No text extracted from DOCX")
@@ -221,14 +383,43 @@ class CVParser:
             raise ImportError("OCR not available. Please install: pip install pytesseract pillow")
         
         try:
-            image = Image.open(io.BytesIO(content))
-            text = pytesseract.image_to_string(image)
+            image = self._preprocess_image(Image.open(io.BytesIO(content)))
+            
+            if TESSEROCR_AVAILABLE:
+                text = self._ocr_tesserocr(image)
+            else:
+                text = pytesseract.image_to_string(image, timeout=self.OCR_TIMEOUT)
+            
             return text.strip() if text else None
         
         except Exception as e:
             logger.error(f"Error parsing image: {e}", exc_info=True)
             raise ValueError(f"Failed to parse image: {str(e)}")
     
+    def _ocr_tesserocr(self, image: "Image.Image") -> str:
+        """Run OCR through a long-lived tesserocr API (no subprocess or temp files)."""
+        with self._tess_lock:
+            if self._tess_api is None:
+                import tesserocr
+                
+                self._tess_api = tesserocr.PyTessBaseAPI()
+                logger.info("Tesseract API loaded (tesserocr)")
+            
+            self._tess_api.SetImage(image)
+            return self._tess_api.GetUTF8Text()
+    
+    def _preprocess_image(self, image: "Image.Image") -> "Image.Image":
+        """Grayscale, downscale and contrast-stretch an image for OCR."""
+        image = image.convert("L")
+        
+        width, height = image.size
+        if max(width, height) > self.OCR_MAX_SIDE:
+            scale = self.OCR_MAX_SIDE / max(width, height)
+            image = image.resize((int(width * scale), int(height * scale)), Image.LANCZOS)
+            logger.debug(f"Downscaled image from {width}x{height} to {image.size[0]}x{image.size[1]} for OCR")
+        
+        return ImageOps.autocontrast(image)
+    
     def extract_cv_summary(self, cv_text: str, max_length: int = 1000) -> str:
         """
         Extract a summary from CV text for better matching.
@@ -248,11 +439,10 @@ class CVParser:
         
         # Try to end at a sentence boundary
         if len(cv_text) > max_length:
-            last_period = summary.rfind('.')
-            last_newline = summary.rfind('\n')
-            
-            cut_point = max(last_period, last_newline)
-            if cut_point > max_length * 0.7:  # At least 70% of max_length
+            # Only boundaries past 70% of max_length count, so search just that tail
+            min_cut = int(max_length * 0.7) + 1
+            cut_point = max(summary.rfind('.', min_cut), summary.rfind('\n', min_cut))
+            if cut_point != -1:
                 summary = summary[:cut_point + 1]
         
         return summary.strip()
@@ -269,6 +459,15 @@ def get_cv_parser() -> CVParser:
     return _cv_parser
 
 
+def parse_cv_file(file_content: bytes, filename: str) -> Optional[str]:
+    """
+    Parse a CV with this process's parser instance.
+    
+    Module-level entry point for process pools (e.g. the Streamlit app).
+    """
+    return get_cv_parser().parse_cv(file_content, filename)
+
+
 if __name__ == "__main__":
     # Test the parser
     logging.basicConfig(
@@ -0,0 +1,111 @@
+"""Embedding Cache - Persist embeddings keyed by content hash."""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Disk-backed cache of embeddings keyed by model and input text.
+    
+    Vectors are stored as float16 to halve the cache size and are returned
+    as float32.
+    """
+    
+    # Keys per SELECT ... IN (...) query (below SQLite's variable limit)
+    LOOKUP_CHUNK = 500
+    
+    # Rows per multi-row INSERT (2 variables each, below the 999 limit)
+    INSERT_CHUNK = 400
+    
+    def __init__(self, db_path: str = "./data/embedding_cache.db"):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            db_path: Path to the SQLite cache file
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Shared by the build script's embedding threads
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embed_cache_f16 (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        """
+        Build the cache key for a text embedded with a given model.
+        
+        Args:
+            model: Embedding model identifier
+            text: Input text
+        
+        Returns:
+            16-byte content hash
+        """
+        return hashlib.blake2b(f"{model}\n{text}".encode("utf-8"), digest_size=16).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            keys: Cache keys
+        
+        Returns:
+            Mapping of found keys to their embedding vectors
+        """
+        found = {}
+        
+        for i in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[i:i + self.LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT key, vec FROM embed_cache_f16 WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+            for key, vec in rows:
+                found[key] = np.frombuffer(vec, dtype=np.float16).astype(np.float32)
+        
+        return found
+    
+    def put_many(self, items: List[Tuple[bytes, np.ndarray]]):
+        """
+        Store embeddings using multi-row INSERT statements.
+        
+        All rows are written in one transaction, committed before returning,
+        so fetched embeddings survive a build that fails later on.
+        
+        Args:
+            items: (key, embedding vector) pairs
+        """
+        statements = []
+        for i in range(0, len(items), self.INSERT_CHUNK):
+            chunk = items[i:i + self.INSERT_CHUNK]
+            params = []
+            for key, vec in chunk:
+                params.extend((key, np.asarray(vec, dtype=np.float16).tobytes()))
+            statements.append((",".join(["(?, ?)"] * len(chunk)), params))
+        
+        with self._lock:
+            for placeholders, params in statements:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO embed_cache_f16 (key, vec) VALUES " + placeholders,
+                    params
+                )
+            self.conn.commit()
+    
+    def close(self):
+        """Commit pending writes and close the cache database."""
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
\ No newline at end of file
@@ -1,4 +1,8 @@
 """Job Embedder - Create embeddings for job postings."""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from typing import List, Dict
 import numpy as np
 from openai import AzureOpenAI
@@ -7,19 +11,49 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class JobEmbedder:
     """Create embeddings for job postings using Azure OpenAI."""
     
+    # (label, job key) pairs of the embedding text, in order
+    _FIELDS = (
+        ("Job Title", "title"),
+        ("Company", "company"),
+        ("Location", "location"),
+        ("Type", "job_type"),
+        ("Category", "category"),
+    )
+    _LONG_FIELDS = (("Description", "description"), ("Requirements", "requirements"))
+    
+    # Embedding requests in flight at once across all embed_jobs() calls of
+    # the process (keeps under Azure rate limits)
+    MAX_CONCURRENT_REQUESTS = 8
+    _request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+    
     def __init__(self):
         """Initialize Azure OpenAI client."""
+        api_key = os.getenv("AZURE_OPENAI_API_KEY")
+        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+        
+        if not all([api_key, endpoint]):
+            raise ValueError(
+                "Missing Azure OpenAI configuration. Please check .env file."
+            )
+        
         self.client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            api_key=api_key,
             api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+            azure_endpoint=endpoint
         )
         
         self.embedding_model = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+        
+        # Optional shortened embeddings (text-embedding-3 models only)
+        dimensions = os.getenv("AZURE_OPENAI_EMBEDDING_DIMENSIONS")
+        self.embedding_options = {'dimensions': int(dimensions)} if dimensions else {}
+        
         print(f"✅ JobEmbedder initialized with model: {self.embedding_model}")
     
     def create_job_text(self, job: Dict) -> str:
@@ -32,41 +66,16 @@ class JobEmbedder:
         Returns:
             Formatted text string
         """
-        parts = []
-        
-        # Title
-        if job.get('title'):
-            parts.append(f"Job Title: {job['title']}")
-        
-        # Company
-        if job.get('company'):
-            parts.append(f"Company: {job['company']}")
+        parts = [f"{label}: {value}" for label, key in self._FIELDS if (value := job.get(key))]
         
-        # Location
-        if job.get('location'):
-            parts.append(f"Location: {job['location']}")
-        
-        # Job Type
-        if job.get('job_type'):
-            parts.append(f"Type: {job['job_type']}")
-        
-        # Category
-        if job.get('category'):
-            parts.append(f"Category: {job['category']}")
-        
-        # Description
-        if job.get('description'):
-            desc = job['description'][:500]  # Limit length
-            parts.append(f"Description: {desc}")
-        
-        # Requirements
-        if job.get('requirements'):
-            req = job['requirements'][:500]  # Limit length
-            parts.append(f"Requirements: {req}")
+        # Long free-text fields are truncated
+        for label, key in self._LONG_FIELDS:
+            if value := job.get(key):
+                parts.append(f"{label}: {value[:500]}")
         
         return " | ".join(parts)
     
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str) -> np.ndarray:
         """
         Get embedding for a single text.
         
@@ -74,13 +83,47 @@ class JobEmbedder:
             text: Input text
         
         Returns:
-            Embedding vector
+            Embedding vector (float32)
         """
         response = self.client.embeddings.create(
             input=text,
-            model=self.embedding_model
+            model=self.embedding_model,
+            **self.embedding_options
         )
-        return response.data[0].embedding
+        return np.asarray(response.data[0].embedding, dtype=np.float32)
+    
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Get embeddings for several texts in one request.
+        
+        Args:
+            texts: Input texts
+        
+        Returns:
+            float32 array of embeddings in input order
+        """
+        response = self.client.embeddings.create(
+            input=texts,
+            model=self.embedding_model,
+            **self.embedding_options
+        )
+        return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+    
+    def _embed_batch(self, batch_texts: List[str], batch_num: int, total_batches: int) -> np.ndarray:
+        """
+        Embed one batch of texts in a single request.
+        
+        Args:
+            batch_texts: Texts of the batch
+            batch_num: 1-based batch number (for logging)
+            total_batches: Number of batches (for logging)
+        
+        Returns:
+            float32 array of embeddings in input order
+        """
+        with self._request_slots:
+            logger.debug(f"🔄 Processing batch {batch_num}/{total_batches} ({len(batch_texts)} jobs)...")
+            return self.get_embeddings(batch_texts)
     
     def embed_jobs(self, jobs: List[Dict], batch_size: int = 100) -> np.ndarray:
         """
@@ -91,29 +134,42 @@ class JobEmbedder:
             batch_size: Number of jobs to process at once
         
         Returns:
-            NumPy array of embeddings
+            NumPy float32 array of embeddings
         """
-        all_embeddings = []
-        total_batches = (len(jobs) + batch_size - 1) // batch_size
+        texts = [self.create_job_text(job) for job in jobs]
         
-        for i in range(0, len(jobs), batch_size):
-            batch = jobs[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            
-            print(f"🔄 Processing batch {batch_num}/{total_batches} ({len(batch)} jobs)...")
-            
-            # Create texts for batch
-            texts = [self.create_job_text(job) for job in batch]
-            
-            # Get embeddings for batch
-            response = self.client.embeddings.create(
-                input=texts,
-                model=self.embedding_model
-            )
-            
-            # Extract embeddings
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
+        # Identical texts get identical embeddings, so each is sent only once
+        unique_texts = list(dict.fromkeys(texts))
         
-        print(f"✅ Created embeddings for {len(all_embeddings)} jobs")
-        return np.array(all_embeddings)
\ No newline at end of file
+        # Sort by text length so each request holds similar-length inputs
+        order = np.argsort([len(text) for text in unique_texts], kind='stable')
+        
+        batches = [
+            [unique_texts[j] for j in order[i:i + batch_size]]
+            for i in range(0, len(unique_texts), batch_size)
+        ]
+        
+        # Filled batch by batch, scattered straight back to the original job order
+        embeddings = None
+        
+        # Requests are independent, so overlap their round trips
+        workers = max(1, min(self.MAX_CONCURRENT_REQUESTS, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(self._embed_batch, batches, range(1, len(batches) + 1), repeat(len(batches)))
+            
+            for start, batch_embeddings in zip(range(0, len(unique_texts), batch_size), results):
+                if embeddings is None:
+                    embeddings = np.empty((len(unique_texts), batch_embeddings.shape[1]), dtype=np.float32)
+                embeddings[order[start:start + len(batch_embeddings)]] = batch_embeddings
+        
+        if embeddings is None:
+            embeddings = np.empty((0, 0), dtype=np.float32)
+        
+        # Scatter the unique embeddings back to every job
+        if len(unique_texts) < len(texts):
+            logger.debug(f"♻️ Skipped {len(texts) - len(unique_texts)} duplicate job texts")
+            position = {text: i for i, text in enumerate(unique_texts)}
+            embeddings = embeddings[[position[text] for text in texts]]
+        
+        logger.debug(f"✅ Created embeddings for {len(embeddings)} jobs")
+        return embeddings
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Binary Index - Binary-quantized in-memory search over the job embeddings
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Number of set bits for every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class BinaryIndex:
+    """
+    Search job embeddings by Hamming distance over 1-bit codes.
+    
+    Each dimension is stored as its sign bit (32x smaller than FP32). A query
+    first ranks all jobs by Hamming distance, then rescores the best
+    `rescore_factor * top_k` candidates with the full FP32 vectors.
+    """
+    
+    def __init__(self, collection, rescore_factor: int = 4, page_size: int = 5000):
+        """
+        Build the index from a ChromaDB collection.
+        
+        Args:
+            collection: ChromaDB collection holding the job embeddings
+            rescore_factor: Candidates rescored per requested result
+            page_size: Records per collection.get call while loading
+        """
+        self.metadatas = []
+        embeddings = []
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+            if len(page['ids']):
+                self.metadatas.extend(page['metadatas'])
+                embeddings.append(np.asarray(page['embeddings'], dtype=np.float32))
+            
+            if len(page['ids']) < page_size:
+                break
+            offset += page_size
+        
+        self.embeddings = np.concatenate(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+        self.codes = np.packbits(self.embeddings > 0, axis=1)
+        self.rescore_factor = rescore_factor
+        
+        print(f"✅ Binary index built: {len(self.metadatas)} jobs, {self.codes.nbytes / 1024:.1f} KB of codes")
+    
+    def search(self, query_embedding: List[float], top_k: int = 5) -> Tuple[List[Dict], List[float]]:
+        """
+        Find the jobs closest to a query embedding.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+        
+        Returns:
+            Metadatas and squared L2 distances of the matches (nearest first),
+            in the same form ChromaDB returns for a single query
+        """
+        if not self.metadatas:
+            return [], []
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_code = np.packbits(query > 0)
+        
+        # Hamming distance: popcount of XOR-ed codes
+        hamming = _POPCOUNT[np.bitwise_xor(self.codes, query_code)].sum(axis=1, dtype=np.int32)
+        
+        n_candidates = min(len(hamming), top_k * self.rescore_factor)
+        candidates = np.argpartition(hamming, n_candidates - 1)[:n_candidates]
+        
+        # Rescore candidates with FP32 (squared L2, as ChromaDB's default space)
+        distances = ((self.embeddings[candidates] - query) ** 2).sum(axis=1)
+        best = np.argsort(distances)[:top_k]
+        
+        return (
+            [self.metadatas[i] for i in candidates[best]],
+            distances[best].tolist()
+        )
\ No newline at end of file
@@ -1,11 +1,29 @@
 """Generate responses using Azure OpenAI with retrieved job context."""
-from typing import List, Dict, Optional
+from operator import itemgetter
+from typing import Iterator, List, Dict, Optional
 from openai import AzureOpenAI
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+SYSTEM_PROMPT = """You are a helpful job search assistant. Your role is to help users find relevant IT/CS jobs from the it-cs.io platform.
+
+When answering:
+1. Be concise and helpful
+2. Highlight the most relevant jobs based on the user's query
+3. Mention key details like company, location, and job type
+4. Provide direct links to job postings
+5. If no jobs match well, suggest broadening the search criteria
+
+Always base your answers on the provided job listings. Don't make up information."""
+
+# Previous messages sent with each query (older turns are dropped)
+HISTORY_WINDOW = 6
+
+# Job fields listed by generate_job_summary
+_summary_fields = itemgetter('title', 'company', 'location', 'url')
+
 
 class JobResponseGenerator:
     """Generate natural language responses about jobs using Azure OpenAI."""
@@ -31,43 +49,29 @@ class JobResponseGenerator:
         self.deployment = deployment
         print(f"✅ Using Azure OpenAI chat: {deployment}")
     
-    def generate_response(
+    def _build_messages(
         self,
         query: str,
-        jobs: List[Dict],
         job_context: str,
         conversation_history: Optional[List[Dict]] = None
-    ) -> str:
+    ) -> List[Dict]:
         """
-        Generate a response based on the query and retrieved jobs.
+        Build the chat messages for a query and its retrieved job context.
         
         Args:
             query: User's question/query
-            jobs: List of retrieved jobs
             job_context: Formatted context string with job details
             conversation_history: Previous conversation messages (optional)
         
         Returns:
-            Generated response text
+            Messages for the chat completion request
         """
-        # System prompt
-        system_prompt = """You are a helpful job search assistant. Your role is to help users find relevant IT/CS jobs from the it-cs.io platform.
-
-When answering:
-1. Be concise and helpful
-2. Highlight the most relevant jobs based on the user's query
-3. Mention key details like company, location, and job type
-4. Provide direct links to job postings
-5. If no jobs match well, suggest broadening the search criteria
-
-Always base your answers on the provided job listings. Don't make up information."""
-
-        # Build messages
-        messages = [{"role": "system", "content": system_prompt}]
+        # Static system prompt first, so the prompt prefix is identical (and cacheable) on every turn
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
         
-        # Add conversation history if provided
+        # Add the most recent conversation history if provided
         if conversation_history:
-            messages.extend(conversation_history)
+            messages.extend(conversation_history[-HISTORY_WINDOW:])
         
         # Add current query with context
         user_message = f"""User Query: {query}
@@ -79,6 +83,29 @@ Please provide a helpful response based on these job listings."""
         
         messages.append({"role": "user", "content": user_message})
         
+        return messages
+    
+    def generate_response(
+        self,
+        query: str,
+        jobs: List[Dict],
+        job_context: str,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> str:
+        """
+        Generate a response based on the query and retrieved jobs.
+        
+        Args:
+            query: User's question/query
+            jobs: List of retrieved jobs
+            job_context: Formatted context string with job details
+            conversation_history: Previous conversation messages (optional)
+        
+        Returns:
+            Generated response text
+        """
+        messages = self._build_messages(query, job_context, conversation_history)
+        
         # Generate response
         response = self.client.chat.completions.create(
             model=self.deployment,
@@ -89,6 +116,40 @@ Please provide a helpful response based on these job listings."""
         
         return response.choices[0].message.content
     
+    def generate_response_stream(
+        self,
+        query: str,
+        jobs: List[Dict],
+        job_context: str,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> Iterator[str]:
+        """
+        Generate a response like generate_response, yielding text as it arrives.
+        
+        Args:
+            query: User's question/query
+            jobs: List of retrieved jobs
+            job_context: Formatted context string with job details
+            conversation_history: Previous conversation messages (optional)
+        
+        Yields:
+            Response text chunks
+        """
+        messages = self._build_messages(query, job_context, conversation_history)
+        
+        stream = self.client.chat.completions.create(
+            model=self.deployment,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=800,
+            stream=True
+        )
+        
+        for chunk in stream:
+            # Azure sends a first chunk with prompt filter results and no choices
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
     def generate_job_summary(self, jobs: List[Dict]) -> str:
         """
         Generate a summary of the retrieved jobs.
@@ -102,10 +163,10 @@ Please provide a helpful response based on these job listings."""
         if not jobs:
             return "No jobs found matching your criteria."
         
-        job_context = "\n\n".join([
-            f"- {job['title']} at {job['company']} ({job['location']}) - {job['url']}"
+        job_context = "\n\n".join(
+            "- {} at {} ({}) - {}".format(*_summary_fields(job))
             for job in jobs[:5]  # Top 5 jobs
-        ])
+        )
         
         messages = [
             {
@@ -0,0 +1,146 @@
+"""
+Int8 Index - Scalar-quantized brute-force search over the job embeddings
+"""
+from pathlib import Path
+from typing import List, Tuple, Union
+import numpy as np
+
+# Re-exported; ChromaManager.add_jobs writes the file next to the ChromaDB data
+from ..vectorstore.chroma_manager import INT8_INDEX_FILE
+
+# Compiled scoring kernel (optional); NumPy is used without numba
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _score_int8(codes, query_codes, scales, query_scale):
+        """Similarity of every row to the query, one parallel loop per row."""
+        n_rows, n_dims = codes.shape
+        similarities = np.empty(n_rows, dtype=np.float32)
+        for i in prange(n_rows):
+            acc = 0
+            for j in range(n_dims):
+                acc += np.int32(codes[i, j]) * np.int32(query_codes[j])
+            similarities[i] = acc * scales[i] * query_scale
+        return similarities
+else:
+    def _score_int8(codes, query_codes, scales, query_scale):
+        """Similarity of every row to the query."""
+        # Integer dot products, accumulated in int32 (int8 would overflow)
+        dots = np.einsum('ij,j->i', codes, query_codes, dtype=np.int32)
+        return dots * scales * query_scale
+
+
+class Int8Index:
+    """
+    Search job embeddings by dot product over int8 codes.
+    
+    Each vector is stored as int8 codes with its own scale
+    (v ≈ scale * codes), 4x smaller than FP32. Jobs are scored with an
+    integer dot product against the quantized query, which for unit-length
+    embeddings approximates cosine similarity.
+    """
+    
+    def __init__(self, ids: np.ndarray, codes: np.ndarray, scales: np.ndarray):
+        """
+        Wrap quantized embeddings.
+        
+        Args:
+            ids: ChromaDB ids, one per row
+            codes: int8 codes (rows x dimensions)
+            scales: float32 scale per row
+        """
+        self.ids = ids
+        self.codes = codes
+        self.scales = scales
+    
+    @staticmethod
+    def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Symmetric row-wise int8 quantization.
+        
+        Args:
+            vectors: FP32 vectors (rows x dimensions)
+        
+        Returns:
+            int8 codes and the float32 scale of each row
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1.0  # all-zero rows stay zero
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 5000) -> "Int8Index":
+        """
+        Quantize all embeddings of a ChromaDB collection.
+        
+        Embeddings are read and quantized one page at a time, so only one
+        page of FP32 vectors is in memory at once.
+        
+        Args:
+            collection: ChromaDB collection holding the job embeddings
+            page_size: Records per collection.get call
+        
+        Returns:
+            Int8Index over the collection
+        """
+        ids, codes, scales = [], [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+            if len(page['ids']):
+                page_codes, page_scales = cls.quantize(np.asarray(page['embeddings'], dtype=np.float32))
+                ids.extend(page['ids'])
+                codes.append(page_codes)
+                scales.append(page_scales)
+            
+            if len(page['ids']) < page_size:
+                break
+            offset += page_size
+        
+        if not ids:
+            return cls(np.asarray([], dtype=str), np.empty((0, 0), dtype=np.int8), np.empty(0, dtype=np.float32))
+        
+        return cls(np.asarray(ids), np.concatenate(codes), np.concatenate(scales))
+    
+    def save(self, path: Union[str, Path]):
+        """Write the index to an .npz file."""
+        np.savez(path, ids=self.ids, codes=self.codes, scales=self.scales)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Int8Index":
+        """Read an index written by save()."""
+        with np.load(path) as data:
+            return cls(data['ids'], data['codes'], data['scales'])
+    
+    def search(self, query_embedding: List[float], top_k: int = 5) -> Tuple[List[str], List[float]]:
+        """
+        Find the jobs closest to a query embedding.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+        
+        Returns:
+            ChromaDB ids and approximate squared L2 distances of the matches
+            (nearest first), assuming unit-length embeddings
+        """
+        if len(self.ids) == 0:
+            return [], []
+        
+        query_codes, query_scale = self.quantize(query_embedding)
+        similarities = _score_int8(self.codes, query_codes[0], self.scales, query_scale[0])
+        
+        top_k = min(top_k, len(similarities))
+        candidates = np.argpartition(-similarities, top_k - 1)[:top_k]
+        best = candidates[np.argsort(-similarities[candidates])]
+        
+        # |a - b|^2 = 2 - 2 a.b for unit vectors, as ChromaDB's default space reports
+        return self.ids[best].tolist(), (2 - 2 * similarities[best]).tolist()
\ No newline at end of file
@@ -1,23 +1,100 @@
 """
 Job Retriever - Semantic search over job postings using ChromaDB
 """
+import asyncio
+from collections import OrderedDict
+import json
+import threading
+import time
 from typing import List, Dict, Optional
-import chromadb
-from chromadb.config import Settings
-from openai import AzureOpenAI
 import os
 from dotenv import load_dotenv
+import numpy as np
+
+from ..embeddings.job_embedder import JobEmbedder
+from ..vectorstore.chroma_manager import (
+    DEFAULT_COLLECTION_NAME,
+    DEFAULT_PERSIST_DIRECTORY,
+    FACET_FIELDS,
+    FACETS_FILE,
+    get_client,
+)
+from .binary_index import BinaryIndex
+from .int8_index import INT8_INDEX_FILE, Int8Index
 
 load_dotenv()
 
+# One job in get_job_context(); long text fields are cut to 200 characters
+_JOB_CONTEXT_TEMPLATE = (
+    "Job {i}:\n"
+    "- Title: {title}\n"
+    "- Company: {company}\n"
+    "- Location: {location}\n"
+    "- Type: {job_type}\n"
+    "- Category: {category}\n"
+    "- Relevance: {relevance_score:.1f}%\n"
+    "- Description: {description}...\n"
+    "- Requirements: {requirements}...\n"
+    "- URL: {url}"
+)
+
+
+def _metadata_to_job(metadata: Dict) -> Dict:
+    """
+    Convert stored ChromaDB metadata into a job dictionary.
+    
+    Args:
+        metadata: Metadata of one job
+        
+    Returns:
+        Job dictionary
+    """
+    # Bound once; this runs for every row of every result list
+    get = metadata.get
+    
+    return {
+        'id': get('job_id'),
+        'title': get('title'),
+        'company': get('company', 'Unknown'),
+        'location': get('location', 'Unknown'),
+        'job_type': get('job_type'),
+        'category': get('category'),
+        'url': get('url'),
+        'description': get('description'),
+        'requirements': get('requirements'),
+        'posted_date': get('posted_date')
+    }
+
+
+class _FieldsOrNA(dict):
+    """format_map() mapping that renders missing job fields as N/A."""
+    
+    def __missing__(self, key):
+        return 'N/A'
+
 
 class JobRetriever:
     """Retrieve relevant jobs using semantic search."""
     
+    # Metadata fields covered by build_metadata_index() and the facets sidecar
+    INDEXED_FIELDS = FACET_FIELDS
+    
+    # In-memory query embedding cache (LRU bound and entry lifetime in seconds)
+    QUERY_CACHE_SIZE = 256
+    QUERY_CACHE_TTL = 15 * 60
+    
+    # Memoized search_by_filters() results (LRU bound); entries are dropped
+    # once the facets sidecar changes
+    FILTER_CACHE_SIZE = 256
+    
+    # Records per collection.get call when scanning all metadata
+    SCAN_PAGE_SIZE = 5000
+    
     def __init__(
         self,
-        collection_name: str = "jobs",
-        persist_directory: str = "./data/chroma_db"
+        collection_name: str = DEFAULT_COLLECTION_NAME,
+        persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+        use_bq: Optional[bool] = None
     ):
         """
         Initialize the job retriever.
@@ -25,26 +102,22 @@ class JobRetriever:
         Args:
             collection_name: Name of the ChromaDB collection
             persist_directory: Directory where ChromaDB data is stored
+            use_bq: Serve unfiltered searches from a binary-quantized index
+                (defaults to the RETRIEVER_USE_BINARY_INDEX env variable)
         """
-        # Initialize Azure OpenAI for embeddings
-        self.embedding_client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
+        # Query embeddings come from the same embedder that built the store
+        self.embedder = JobEmbedder()
         
-        self.embedding_model = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+        # text -> (timestamp, embedding); the retriever is shared across sessions
+        self._query_cache: OrderedDict = OrderedDict()
+        self._query_cache_lock = threading.Lock()
         
-        print(f"✅ Using Azure OpenAI embeddings: {self.embedding_model}")
+        # (filters, top_k) -> (data version, jobs); UIs repeat the same filter combinations
+        self._filter_cache: OrderedDict = OrderedDict()
+        self._filter_cache_lock = threading.Lock()
         
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+        # Initialize ChromaDB client (shared with ChromaManager for the same directory)
+        self.client = get_client(persist_directory)
         
         # Try to get collection, if it doesn't exist, show helpful error
         try:
@@ -59,9 +132,35 @@ class JobRetriever:
                 f"Please build the vector store first by running: "
                 f"python scripts/build_vectorstore.py"
             )
+        
+        # Distance function the collection was built with (older stores use l2)
+        self.space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+        
+        if use_bq is None:
+            use_bq = os.getenv("RETRIEVER_USE_BINARY_INDEX", "").lower() in ("1", "true", "yes")
+        
+        # Unique filter values, filled by build_metadata_index()
+        self._meta_index = None
+        
+        # Unique filter values written by ChromaManager at ingest, reloaded when the file changes
+        self.facets_path = os.path.join(persist_directory, FACETS_FILE)
+        self._facets = None
+        self._facets_mtime = None
+        
+        # Optional 1-bit index with FP32 rescoring (filtered searches still use ChromaDB),
+        # rebuilt when the data version changes
+        self.binary_index = BinaryIndex(self.collection) if use_bq else None
+        self._binary_index_version = self._data_version()
+        self._binary_index_lock = threading.Lock()
+        
+        # int8 index written by ChromaManager.add_jobs, (re)loaded by retrieve_jobs_int8()
+        # whenever the file changes
+        self.int8_index_path = os.path.join(persist_directory, INT8_INDEX_FILE)
+        self._int8_index = None
+        self._int8_mtime = None
     
 
-    def _get_embedding(self, text: str) -> List[float]:
+    def _get_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a text using Azure OpenAI.
         
@@ -71,11 +170,84 @@ class JobRetriever:
         Returns:
             Embedding vector
         """
-        response = self.embedding_client.embeddings.create(
-            input=text,
-            model=self.embedding_model
-        )
-        return response.data[0].embedding
+        return self._get_embeddings([text])[0]
+    
+    def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for several texts in one Azure OpenAI request.
+        
+        Texts embedded within the last QUERY_CACHE_TTL seconds are served
+        from memory; only the rest are sent.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            float32 array of embedding vectors (one row per text, in input order)
+        """
+        now = time.monotonic()
+        embeddings = []
+        
+        with self._query_cache_lock:
+            for text in texts:
+                entry = self._query_cache.get(text)
+                if entry is not None and now - entry[0] < self.QUERY_CACHE_TTL:
+                    self._query_cache.move_to_end(text)
+                    embeddings.append(entry[1])
+                else:
+                    embeddings.append(None)
+        
+        misses = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        if not misses:
+            return np.stack(embeddings)
+        
+        # Rows stay float32 arrays; Chroma takes them without .tolist() boxing
+        new = dict(zip(misses, self.embedder.get_embeddings(misses)))
+        
+        with self._query_cache_lock:
+            now = time.monotonic()
+            for text, embedding in new.items():
+                self._query_cache[text] = (now, embedding)
+                self._query_cache.move_to_end(text)
+            while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        
+        return np.stack([new[text] if embedding is None else embedding for text, embedding in zip(texts, embeddings)])
+    
+    def _format_results(
+        self,
+        metadatas: List[Dict],
+        distances: List[float],
+        space: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Convert one query's ChromaDB metadatas/distances into job dictionaries.
+        
+        Args:
+            metadatas: Metadata of the matched jobs
+            distances: Distances of the matched jobs
+            space: Distance function of the distances (defaults to the collection's)
+            
+        Returns:
+            List of job dictionaries with relevance scores
+        """
+        jobs = []
+        
+        # Normalize distances to 0-100% relevance score, for all matches at once.
+        # For unit-length embeddings both spaces reduce to cosine similarity:
+        # cosine/ip distance = 1 - cos (0..2), squared L2 = 2 - 2 cos (0..4)
+        d = np.asarray(distances, dtype=np.float64)
+        cosine = 1.0 - d if (space or self.space) in ("cosine", "ip") else 1.0 - d / 2
+        similarities = np.clip(cosine * 100, 0, 100).tolist()
+        
+        for metadata, distance, similarity in zip(metadatas, distances, similarities):
+            job = _metadata_to_job(metadata)
+            job['relevance_score'] = similarity
+            job['distance'] = distance
+            
+            jobs.append(job)
+        
+        return jobs
     
     def retrieve_jobs(
         self,
@@ -94,57 +266,124 @@ class JobRetriever:
         Returns:
             List of job dictionaries with relevance scores
         """
-        # Generate query embedding
-        query_embedding = self._get_embedding(query)
+        return self.retrieve_jobs_batch([query], top_k=top_k, filter_dict=filter_dict)[0]
+    
+    async def retrieve_jobs_async(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Retrieve relevant jobs without blocking the event loop.
+        
+        Runs retrieve_jobs() in a worker thread, so the embedding request and
+        the ChromaDB query (both blocking I/O) overlap with other coroutines.
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filter_dict: Optional metadata filters
+            
+        Returns:
+            List of job dictionaries with relevance scores
+        """
+        return await asyncio.to_thread(self.retrieve_jobs, query, top_k, filter_dict)
+    
+    def retrieve_jobs_int8(self, query: str, top_k: int = 5) -> List[Dict]:
+        """
+        Retrieve relevant jobs by brute-force search over int8 embeddings.
+        
+        Scores every job against the query in memory and fetches only the
+        matches' metadata from ChromaDB. Falls back to retrieve_jobs() when
+        the vector store has no int8 index.
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            
+        Returns:
+            List of job dictionaries with relevance scores
+        """
+        try:
+            mtime = os.stat(self.int8_index_path).st_mtime_ns
+        except OSError:
+            return self.retrieve_jobs(query, top_k=top_k)
+        
+        if mtime != self._int8_mtime:
+            self._int8_index = Int8Index.load(self.int8_index_path)
+            self._int8_mtime = mtime
+        
+        ids, distances = self._int8_index.search(self._get_embedding(query), top_k)
+        if not ids:
+            return []
+        
+        # get() does not return records in the requested order
+        results = self.collection.get(ids=ids, include=["metadatas"])
+        metadata_by_id = dict(zip(results['ids'], results['metadatas']))
+        matches = [(metadata_by_id[id_], distance) for id_, distance in zip(ids, distances) if id_ in metadata_by_id]
+        
+        return self._format_results([metadata for metadata, _ in matches], [distance for _, distance in matches], space="l2")
+    
+    def retrieve_jobs_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """
+        Retrieve relevant jobs for several queries at once.
+        
+        All queries are embedded in a single request and searched with a
+        single ChromaDB query.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            filter_dict: Optional metadata filters applied to every query
+            
+        Returns:
+            One list of job dictionaries per query, in query order
+        """
+        if not queries:
+            return []
+        
+        query_embeddings = self._get_embeddings(queries)
+        
+        binary_index = self._current_binary_index()
+        if binary_index is not None and not filter_dict:
+            return [
+                self._format_results(*binary_index.search(query_embedding, top_k), space="l2")
+                for query_embedding in query_embeddings
+            ]
         
-        # Search in ChromaDB
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=top_k,
             where=filter_dict,
             include=["metadatas", "documents", "distances"]
         )
         
-        # Format results
-        jobs = []
-        
-        if results['ids'] and len(results['ids'][0]) > 0:
-            # Get all distances to normalize them
-            distances = results['distances'][0]
-            
-            # Normalize distances to 0-100% relevance score
-            # ChromaDB uses cosine distance (0 = identical, 2 = opposite)
-            # Convert to similarity: similarity = 1 - (distance / 2)
-            # Then convert to percentage
-            
-            for i in range(len(results['ids'][0])):
-                metadata = results['metadatas'][0][i]
-                distance = distances[i]
-                
-                # Convert cosine distance to similarity score (0-100%)
-                # Cosine distance ranges from 0 (identical) to 2 (opposite)
-                # Similarity = (1 - distance/2) * 100
-                similarity = max(0, min(100, (1 - distance / 2) * 100))
-                
-                job = {
-                    'id': metadata.get('job_id'),
-                    'title': metadata.get('title'),
-                    'company': metadata.get('company', 'Unknown'),
-                    'location': metadata.get('location', 'Unknown'),
-                    'job_type': metadata.get('job_type'),
-                    'category': metadata.get('category'),
-                    'url': metadata.get('url'),
-                    'description': metadata.get('description'),
-                    'requirements': metadata.get('requirements'),
-                    'posted_date': metadata.get('posted_date'),
-                    'relevance_score': similarity,
-                    'distance': distance
-                }
-                
-                jobs.append(job)
-        
-        return jobs
+        return [
+            self._format_results(metadatas, distances)
+            for metadatas, distances in zip(results['metadatas'], results['distances'])
+        ]
 
+    def _current_binary_index(self) -> Optional[BinaryIndex]:
+        """Binary index over the current data, rebuilt after the store changed."""
+        if self.binary_index is None:
+            return None
+        
+        version = self._data_version()
+        if version != self._binary_index_version:
+            with self._binary_index_lock:
+                # Another session may have rebuilt it while we waited
+                if version != self._binary_index_version:
+                    self.binary_index = BinaryIndex(self.collection)
+                    self._binary_index_version = version
+        
+        return self.binary_index
+    
     def get_collection_stats(self) -> Dict:
         """
         Get statistics about the job collection.
@@ -189,25 +428,58 @@ class JobRetriever:
         Returns:
             List of matching jobs
         """
-        # Build filter dictionary
-        where_filter = {}
+        key = (location, job_type, category, company, top_k)
+        version = self._data_version()
+        
+        with self._filter_cache_lock:
+            entry = self._filter_cache.get(key)
+            if entry is not None and entry[0] == version:
+                self._filter_cache.move_to_end(key)
+                return [dict(job) for job in entry[1]]
+        
+        jobs = self._search_by_filters(location, job_type, category, company, top_k)
+        
+        with self._filter_cache_lock:
+            self._filter_cache[key] = (version, jobs)
+            self._filter_cache.move_to_end(key)
+            while len(self._filter_cache) > self.FILTER_CACHE_SIZE:
+                self._filter_cache.popitem(last=False)
+        
+        # Callers get copies, so they cannot change the cached jobs
+        return [dict(job) for job in jobs]
+    
+    def _search_by_filters(
+        self,
+        location: Optional[str],
+        job_type: Optional[str],
+        category: Optional[str],
+        company: Optional[str],
+        top_k: int
+    ) -> List[Dict]:
+        """Run search_by_filters() against ChromaDB, bypassing the cache."""
+        # Build filter conditions; location/company fall back to substring
+        # matching unless the value is a known facet (e.g. picked from a dropdown)
+        conditions = []
         
         if location:
-            where_filter['location'] = {'$contains': location}
+            conditions.append(self._match_condition('location', location))
         
         if job_type:
-            where_filter['job_type'] = job_type
+            conditions.append({'job_type': job_type})
         
         if category:
-            where_filter['category'] = category
+            conditions.append({'category': category})
         
         if company:
-            where_filter['company'] = {'$contains': company}
+            conditions.append(self._match_condition('company', company))
         
         # If no filters, return empty
-        if not where_filter:
+        if not conditions:
             return []
         
+        # ChromaDB expects several conditions combined explicitly
+        where_filter = conditions[0] if len(conditions) == 1 else {'$and': conditions}
+        
         # Query with filters only (no semantic search)
         results = self.collection.get(
             where=where_filter,
@@ -219,25 +491,45 @@ class JobRetriever:
         jobs = []
         
         if results['ids']:
-            for i, metadata in enumerate(results['metadatas']):
-                job = {
-                    'id': metadata.get('job_id'),
-                    'title': metadata.get('title'),
-                    'company': metadata.get('company'),
-                    'location': metadata.get('location'),
-                    'job_type': metadata.get('job_type'),
-                    'category': metadata.get('category'),
-                    'url': metadata.get('url'),
-                    'description': metadata.get('description'),
-                    'requirements': metadata.get('requirements'),
-                    'posted_date': metadata.get('posted_date'),
-                    'relevance_score': 100.0  # No semantic search, so all equally relevant
-                }
+            for metadata in results['metadatas']:
+                job = _metadata_to_job(metadata)
+                job['relevance_score'] = 100.0  # No semantic search, so all equally relevant
                 
                 jobs.append(job)
         
         return jobs
     
+    def _data_version(self) -> Optional[int]:
+        """
+        Token that changes whenever jobs are added to the vector store.
+        
+        Uses the facets sidecar's mtime. ChromaManager.flush_facets() rewrites
+        the sidecar after every add_jobs() call, or once at the end of a
+        bulk_load() build (also from other processes), so no ChromaDB round
+        trip is needed. Stores without a sidecar are never written to by
+        add_jobs.
+        """
+        try:
+            return os.stat(self.facets_path).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _match_condition(self, field: str, value: str) -> Dict:
+        """
+        Filter condition for a free-text field.
+        
+        Exact values known from the facets sidecar or metadata index use an
+        equality match; anything else is matched as a substring.
+        """
+        facets = self._load_facets()
+        if facets is None:
+            facets = self._meta_index
+        
+        if facets is not None and value in facets[field]:
+            return {field: value}
+        
+        return {field: {'$contains': value}}
+    
     def get_job_by_id(self, job_id: int) -> Optional[Dict]:
         """
         Retrieve a specific job by ID.
@@ -248,72 +540,136 @@ class JobRetriever:
         Returns:
             Job dictionary or None
         """
+        # Primary-key lookup; ChromaManager.add_jobs stores jobs as "job_<id>"
         results = self.collection.get(
-            where={'job_id': job_id},
+            ids=[f"job_{job_id}"],
             include=["metadatas"]
         )
         
+        # Collections with other id schemes still resolve through the metadata filter
+        if not results['ids']:
+            results = self.collection.get(
+                where={'job_id': job_id},
+                limit=1,
+                include=["metadatas"]
+            )
+        
         if results['ids'] and len(results['ids']) > 0:
-            metadata = results['metadatas'][0]
-            
-            return {
-                'id': metadata.get('job_id'),
-                'title': metadata.get('title'),
-                'company': metadata.get('company'),
-                'location': metadata.get('location'),
-                'job_type': metadata.get('job_type'),
-                'category': metadata.get('category'),
-                'url': metadata.get('url'),
-                'description': metadata.get('description'),
-                'requirements': metadata.get('requirements'),
-                'posted_date': metadata.get('posted_date')
-            }
+            return _metadata_to_job(results['metadatas'][0])
         
         return None
     
-    def get_all_categories(self) -> List[str]:
-        """Get all unique job categories."""
-        # This is a workaround since ChromaDB doesn't have a direct way to get unique values
-        # We'll query all jobs and extract unique categories
-        results = self.collection.get(
-            include=["metadatas"],
-            limit=10000  # Adjust based on your dataset size
-        )
+    def get_jobs_by_ids(self, job_ids: List[int]) -> List[Dict]:
+        """
+        Retrieve several jobs by ID with a single ChromaDB request.
+        
+        Ids not in the collection are left out of the result.
+        
+        Args:
+            job_ids: Job IDs
+            
+        Returns:
+            Job dictionaries of the found IDs, in input order
+        """
+        ids = [f"job_{job_id}" for job_id in job_ids]
+        if not ids:
+            return []
         
-        categories = set()
-        for metadata in results['metadatas']:
-            if metadata.get('category'):
-                categories.add(metadata['category'])
+        # get() skips unknown ids and does not return records in the requested order
+        results = self.collection.get(ids=list(dict.fromkeys(ids)), include=["metadatas"])
+        metadata_by_id = dict(zip(results['ids'], results['metadatas']))
         
-        return sorted(list(categories))
+        return [_metadata_to_job(metadata_by_id[id_]) for id_ in ids if id_ in metadata_by_id]
     
-    def get_all_locations(self) -> List[str]:
-        """Get all unique job locations."""
-        results = self.collection.get(
-            include=["metadatas"],
-            limit=10000
-        )
+    def build_metadata_index(self):
+        """
+        Collect the unique filter values of all jobs in one pass.
         
-        locations = set()
-        for metadata in results['metadatas']:
-            if metadata.get('location'):
-                locations.add(metadata['location'])
+        Afterwards get_all_categories/locations/companies answer from the
+        index instead of scanning the collection. Not needed (and skipped)
+        when the vector store has a facets sidecar.
+        """
+        if self._load_facets() is not None:
+            print("✅ Metadata index loaded from facets sidecar")
+            return
+        
+        self._meta_index = {field: set() for field in self.INDEXED_FIELDS}
+        n_jobs = 0
+        for metadata in self._iter_metadatas():
+            n_jobs += 1
+            for field in self.INDEXED_FIELDS:
+                if metadata.get(field):
+                    self._meta_index[field].add(metadata[field])
+        
+        print(f"✅ Metadata index built for {n_jobs} jobs")
+    
+    def _iter_metadatas(self):
+        """Yield the metadata of every stored job, one page of SCAN_PAGE_SIZE at a time."""
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=["metadatas"],
+                limit=self.SCAN_PAGE_SIZE,
+                offset=offset
+            )['metadatas']
+            yield from page
+            
+            if len(page) < self.SCAN_PAGE_SIZE:
+                return
+            offset += self.SCAN_PAGE_SIZE
+    
+    def _load_facets(self) -> Optional[Dict]:
+        """
+        Read the facets sidecar if it changed since the last read.
         
-        return sorted(list(locations))
+        Returns:
+            Unique values per indexed field, or None if there is no sidecar
+        """
+        try:
+            mtime = os.path.getmtime(self.facets_path)
+        except OSError:
+            return None
+        
+        if mtime != self._facets_mtime:
+            with open(self.facets_path, encoding='utf-8') as f:
+                data = json.load(f)
+            self._facets = {field: set(data.get(field, ())) for field in self.INDEXED_FIELDS}
+            self._facets_mtime = mtime
+        
+        return self._facets
+    
+    def _unique_values(self, field: str) -> List[str]:
+        """Sorted unique values of a metadata field."""
+        facets = self._load_facets()
+        if facets is not None:
+            return sorted(facets[field])
+        
+        if self._meta_index is not None:
+            return sorted(self._meta_index[field])
+        
+        # No sidecar or index: ChromaDB has no distinct query, so scan all jobs
+        values = set()
+        for metadata in self._iter_metadatas():
+            if metadata.get(field):
+                values.add(metadata[field])
+        
+        return sorted(values)
+    
+    def get_all_categories(self) -> List[str]:
+        """Get all unique job categories."""
+        return self._unique_values('category')
+    
+    def get_all_locations(self) -> List[str]:
+        """Get all unique job locations."""
+        return self._unique_values('location')
     
     def get_all_companies(self) -> List[str]:
         """Get all unique companies."""
-        results = self.collection.get(
-            include=["metadatas"],
-            limit=10000
-        )
-        
-        companies = set()
-        for metadata in results['metadatas']:
-            if metadata.get('company'):
-                companies.add(metadata['company'])
-        
-        return sorted(list(companies))
+        return self._unique_values('company')
+    
+    def get_all_job_types(self) -> List[str]:
+        """Get all unique job types."""
+        return self._unique_values('job_type')
     
     def get_job_context(self, jobs: List[Dict]) -> str:
         """
@@ -328,21 +684,15 @@ class JobRetriever:
         if not jobs:
             return "No jobs found."
         
-        context_parts = []
-        
-        for i, job in enumerate(jobs, 1):
-            context = f"""
-    Job {i}:
-    - Title: {job['title']}
-    - Company: {job['company']}
-    - Location: {job['location']}
-    - Type: {job.get('job_type', 'N/A')}
-    - Category: {job.get('category', 'N/A')}
-    - Relevance: {job.get('relevance_score', 0):.1f}%
-    - Description: {job.get('description', 'N/A')[:200]}...
-    - Requirements: {job.get('requirements', 'N/A')[:200]}...
-    - URL: {job['url']}
-    """
-            context_parts.append(context.strip())
+        context_parts = [
+            _JOB_CONTEXT_TEMPLATE.format_map(_FieldsOrNA(
+                job,
+                i=i,
+                relevance_score=job.get('relevance_score', 0),
+                description=(job.get('description') or 'N/A')[:200],
+                requirements=(job.get('requirements') or 'N/A')[:200]
+            ))
+            for i, job in enumerate(jobs, 1)
+        ]
         
         return "\n\n".join(context_parts)
\ No newline at end of file
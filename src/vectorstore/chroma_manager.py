@@ -1,17 +1,90 @@
 """ChromaDB Manager for storing and retrieving job embeddings."""
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+from pathlib import Path
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
+# Store used by the build script, the retriever and the app
+DEFAULT_COLLECTION_NAME = "jobs"
+DEFAULT_PERSIST_DIRECTORY = "./data/chroma_db"
+
+# Sidecar file (in the persist directory) with the unique filter values of all jobs
+FACETS_FILE = "facets.json"
+
+# Sidecar file with the int8-quantized embeddings (see src.rag.int8_index)
+INT8_INDEX_FILE = "embeddings_i8.npz"
+FACET_FIELDS = ('location', 'category', 'job_type', 'company')
+
+# Stored metadata fields: (job key, default, max length); job_id comes first
+_META_FIELDS = (
+    ('title', 'Unknown', 500),
+    ('company', 'Unknown', 200),
+    ('location', 'Unknown', 200),
+    ('job_type', 'Unknown', 100),
+    ('category', 'Unknown', 200),
+    ('url', '', 500),
+    ('description', '', 1000),
+    ('requirements', '', 1000),
+    ('posted_date', 'Unknown', 50),
+)
+_META_KEYS = ('job_id',) + tuple(key for key, _, _ in _META_FIELDS)
+
+# One PersistentClient per directory, shared by ChromaManager and JobRetriever
+_clients: Dict = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(persist_directory: str):
+    """
+    Get the shared ChromaDB client for a directory, opening it on first use.
+    
+    Args:
+        persist_directory: Directory where ChromaDB data is stored
+    
+    Returns:
+        PersistentClient for the directory
+    """
+    key = os.path.abspath(persist_directory)
+    
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = chromadb.PersistentClient(
+                path=persist_directory,
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
+            )
+        return _clients[key]
+
 
 class ChromaManager:
     """Manage ChromaDB operations for job vectors."""
     
+    # Records per collection.add call (Chroma's recommended 50-250 range)
+    ADD_BATCH_SIZE = 250
+    
+    # HNSW settings for new collections; they cannot be changed afterwards.
+    # search_ef is set here too, since collection.modify() replaces all metadata
+    HNSW_PARAMS = {
+        "hnsw:space": "cosine",
+        "hnsw:construction_ef": 200,
+        "hnsw:M": 32,
+        "hnsw:search_ef": 64
+    }
+    
     def __init__(
         self,
-        collection_name: str = "jobs",
-        persist_directory: str = "./data/chroma_db"
+        collection_name: str = DEFAULT_COLLECTION_NAME,
+        persist_directory: str = DEFAULT_PERSIST_DIRECTORY
     ):
         """
         Initialize ChromaDB manager.
@@ -23,24 +96,35 @@ class ChromaManager:
         self.collection_name = collection_name
         self.persist_directory = persist_directory
         
-        # Initialize client
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+        # Initialize client (reused if this directory is already open)
+        self.client = get_client(persist_directory)
         
         self.collection = None
+        
+        # Filter values of stored jobs, loaded from the sidecar on first add
+        self.facets_path = Path(persist_directory) / FACETS_FILE
+        self._facets = None
+        self._facets_dirty = False
+        
+        # int8 codes of stored jobs for JobRetriever.retrieve_jobs_int8, as
+        # (ids, codes, scales) chunks; loaded from the sidecar on first add
+        self.int8_index_path = Path(persist_directory) / INT8_INDEX_FILE
+        self._int8_parts = None
+        self._int8_dirty = False
+        
+        # Inside bulk_load(), sidecar writes are deferred to the end of the block
+        self._bulk = False
+        
         print(f"✅ ChromaDB initialized at: {persist_directory}")
     
-    def create_collection(self, reset: bool = False):
+    def create_collection(self, reset: bool = False, hnsw_params: Optional[Dict] = None):
         """
         Create or get collection.
         
         Args:
             reset: If True, delete existing collection and create new one
+            hnsw_params: Overrides for HNSW_PARAMS (only applied when the
+                collection is created)
         """
         if reset:
             try:
@@ -48,20 +132,94 @@ class ChromaManager:
                 print(f"🗑️  Deleted existing collection: {self.collection_name}")
             except Exception as e:
                 print(f"ℹ️  No existing collection to delete: {e}")
+            
+            self.facets_path.unlink(missing_ok=True)
+            self._facets = None
+            self._facets_dirty = False
+            
+            self.int8_index_path.unlink(missing_ok=True)
+            self._int8_parts = None
+            self._int8_dirty = False
         
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
-            metadata={"description": "Job postings with embeddings"}
+            metadata={
+                "description": "Job postings with embeddings",
+                # add_jobs stores unit-length vectors, so dot product == cosine
+                "normalized": True,
+                **self.HNSW_PARAMS,
+                **(hnsw_params or {})
+            }
         )
         print(f"✅ Collection ready: {self.collection_name}")
     
-    def add_jobs(self, jobs: List[Dict], embeddings: List[List[float]]):
+    def _sqlite_connection(self):
+        """
+        Get ChromaDB's own SQLite connection for the current thread.
+        
+        Only the legacy Python segment backend (chromadb < 1.0) exposes it;
+        newer versions manage SQLite from Rust.
+        
+        Returns:
+            Connection or None if not reachable
+        """
+        try:
+            from chromadb.db.impl.sqlite import SqliteDB
+            
+            system = self.client._system
+            if not system.settings.chroma_api_impl.endswith("SegmentAPI"):
+                return None
+            
+            return system.instance(SqliteDB)._conn_pool.connect()
+        except Exception:
+            return None
+    
+    @contextmanager
+    def bulk_load(self):
+        """
+        Relax SQLite durability while rebuilding the collection.
+        
+        Sets synchronous=OFF and temp_store=MEMORY for the duration of the
+        block and restores the previous values afterwards, even on error.
+        Sidecar files are written once when the block exits instead of after
+        every add_jobs() call. Safe only for idempotent full rebuilds.
+        """
+        self._bulk = True
+        
+        try:
+            conn = self._sqlite_connection()
+            
+            if conn is None:
+                print("ℹ️  SQLite tuning not available for this ChromaDB version")
+                yield
+                return
+            
+            synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+            temp_store = conn.execute("PRAGMA temp_store").fetchone()[0]
+            
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            print("⚡ SQLite bulk-load mode enabled")
+            
+            try:
+                yield
+            finally:
+                conn.execute(f"PRAGMA synchronous={int(synchronous)}")
+                conn.execute(f"PRAGMA temp_store={int(temp_store)}")
+                print("✅ SQLite durability settings restored")
+        finally:
+            # Jobs added before an error are stored, so their sidecars are too
+            self._bulk = False
+            self._flush_sidecars()
+    
+    def add_jobs(self, jobs: List[Dict], embeddings: Union[np.ndarray, List[List[float]]]):
         """
         Add jobs with embeddings to collection.
         
         Args:
             jobs: List of job dictionaries
-            embeddings: List of embedding vectors
+            embeddings: Embedding vectors (NumPy array or list of vectors),
+                stored L2-normalized
         """
         if self.collection is None:
             raise ValueError("Collection not initialized. Call create_collection() first.")
@@ -69,57 +227,150 @@ class ChromaManager:
         if len(jobs) != len(embeddings):
             raise ValueError(f"Jobs ({len(jobs)}) and embeddings ({len(embeddings)}) count mismatch")
         
-        # Prepare data for ChromaDB
-        ids = []
-        documents = []
-        metadatas = []
-        embedding_list = []
+        if not jobs:
+            return
         
-        for i, job in enumerate(jobs):
-            # Create unique ID
-            job_id = str(job.get('id', i))
-            ids.append(f"job_{job_id}")
-            
-            # Create document text (for reference)
-            doc_text = f"{job.get('title', '')} {job.get('company', '')} {job.get('description', '')}"
-            documents.append(doc_text[:1000])  # Limit length
-            
-            # Create metadata
-            metadata = {
-                'job_id': int(job.get('id', i)),
-                'title': str(job.get('title', 'Unknown'))[:500],
-                'company': str(job.get('company', 'Unknown'))[:200],
-                'location': str(job.get('location', 'Unknown'))[:200],
-                'job_type': str(job.get('job_type', 'Unknown'))[:100],
-                'category': str(job.get('category', 'Unknown'))[:200],
-                'url': str(job.get('url', ''))[:500],
-                'description': str(job.get('description', ''))[:1000],
-                'requirements': str(job.get('requirements', ''))[:1000],
-                'posted_date': str(job.get('posted_date', 'Unknown'))[:50]
-            }
-            metadatas.append(metadata)
-            
-            # Add embedding
-            embedding_list.append(embeddings[i])
+        # Prepare data for ChromaDB, one column at a time
+        job_ids = [job.get('id', i) for i, job in enumerate(jobs)]
+        ids = [f"job_{job_id}" for job_id in job_ids]
+        
+        # Document text (for reference)
+        documents = [
+            f"{job.get('title', '')} {job.get('company', '')} {job.get('description', '')}"[:1000]
+            for job in jobs
+        ]
+        
+        # Metadata, zipped from columns into one dict per job
+        columns = [list(map(int, job_ids))] + [
+            [str(job.get(key, default))[:max_len] for job in jobs]
+            for key, default, max_len in _META_FIELDS
+        ]
+        metadatas = [dict(zip(_META_KEYS, row)) for row in zip(*columns)]
+        
+        # Normalize once here instead of on every query. np.array makes the
+        # single float32 copy (the caller's array is left untouched), which is
+        # then scaled in place and sliced per batch without further copies
+        vectors = np.array(embeddings, dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
         
         # Add to collection in batches
-        batch_size = 100
+        batch_size = self.ADD_BATCH_SIZE
         total_batches = (len(ids) + batch_size - 1) // batch_size
         
         for i in range(0, len(ids), batch_size):
             batch_num = i // batch_size + 1
             end_idx = min(i + batch_size, len(ids))
             
-            print(f"📦 Adding batch {batch_num}/{total_batches} ({end_idx - i} jobs)...")
+            logger.debug(f"📦 Adding batch {batch_num}/{total_batches} ({end_idx - i} jobs)...")
             
             self.collection.add(
                 ids=ids[i:end_idx],
                 documents=documents[i:end_idx],
                 metadatas=metadatas[i:end_idx],
-                embeddings=embedding_list[i:end_idx]
+                embeddings=vectors[i:end_idx]  # array view, no per-float boxing
             )
         
-        print(f"✅ Added {len(ids)} jobs to collection")
+        logger.debug(f"✅ Added {len(ids)} jobs to collection")
+        
+        self._update_facets(metadatas)
+        self._update_int8_index(ids, vectors)
+        if not self._bulk:
+            self._flush_sidecars()
+    
+    def _flush_sidecars(self):
+        """Write pending sidecar files; facets last, as they carry the data version."""
+        self.flush_int8_index()
+        self.flush_facets()
+    
+    def _update_int8_index(self, ids: List[str], vectors: np.ndarray):
+        """
+        Quantize newly added embeddings for the int8 index.
+        
+        They reach the sidecar with the next flush_int8_index().
+        
+        Args:
+            ids: ChromaDB ids of the added jobs
+            vectors: Their normalized float32 embeddings
+        """
+        # Imported here: src.rag imports this module
+        from ..rag.int8_index import Int8Index
+        
+        if self._int8_parts is None:
+            self._int8_parts = []
+            if self.int8_index_path.exists():
+                index = Int8Index.load(self.int8_index_path)
+                self._int8_parts.append((index.ids, index.codes, index.scales))
+        
+        codes, scales = Int8Index.quantize(vectors)
+        self._int8_parts.append((np.asarray(ids), codes, scales))
+        self._int8_dirty = True
+    
+    def flush_int8_index(self):
+        """Write the int8 index sidecar if jobs were added since the last write."""
+        if not self._int8_dirty:
+            return
+        
+        from ..rag.int8_index import Int8Index
+        
+        ids = np.concatenate([part[0] for part in self._int8_parts])
+        codes = np.concatenate([part[1] for part in self._int8_parts])
+        scales = np.concatenate([part[2] for part in self._int8_parts])
+        
+        # ChromaDB ignores re-added ids and keeps the first record; so does the index
+        _, first = np.unique(ids, return_index=True)
+        first.sort()
+        if len(first) < len(ids):
+            ids, codes, scales = ids[first], codes[first], scales[first]
+        self._int8_parts = [(ids, codes, scales)]
+        
+        # Write then rename, so readers never see a partial file
+        tmp_path = self.int8_index_path.with_suffix('.tmp.npz')
+        Int8Index(ids, codes, scales).save(tmp_path)
+        os.replace(tmp_path, self.int8_index_path)
+        self._int8_dirty = False
+    
+    def _update_facets(self, metadatas: List[Dict]):
+        """
+        Merge the filter values of newly added jobs into the in-memory facets.
+        
+        They reach the sidecar with the next flush_facets().
+        
+        Args:
+            metadatas: Metadata of the added jobs
+        """
+        if self._facets is None:
+            self._facets = {field: set() for field in FACET_FIELDS}
+            if self.facets_path.exists():
+                with open(self.facets_path, encoding='utf-8') as f:
+                    for field, values in json.load(f).items():
+                        if field in self._facets:
+                            self._facets[field].update(values)
+        
+        for metadata in metadatas:
+            for field in FACET_FIELDS:
+                if metadata.get(field):
+                    self._facets[field].add(metadata[field])
+        
+        self._facets_dirty = True
+    
+    def flush_facets(self):
+        """
+        Write the facets sidecar if jobs were added since the last write.
+        
+        Lets JobRetriever list categories, locations etc. without scanning
+        the collection. The rewrite also bumps the file's mtime, which
+        JobRetriever uses as the data version of its caches, so it happens
+        after every add, even when no new filter values came in.
+        """
+        if not self._facets_dirty:
+            return
+        
+        # Write then rename, so readers never see a partial file
+        tmp_path = self.facets_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({field: sorted(values) for field, values in self._facets.items()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.facets_path)
+        self._facets_dirty = False
     
     def get_stats(self) -> Dict:
         """
@@ -141,7 +392,7 @@ class ChromaManager:
     
     def query(
         self,
-        query_embeddings: List[List[float]],
+        query_embeddings: Union[np.ndarray, List[List[float]]],
         n_results: int = 10,
         where: Optional[Dict] = None
     ) -> Dict:
@@ -149,7 +400,7 @@ class ChromaManager:
         Query the collection.
         
         Args:
-            query_embeddings: Query embedding vectors
+            query_embeddings: Query embedding vectors (NumPy array or list of vectors)
             n_results: Number of results to return
             where: Optional metadata filters
         